@@ -0,0 +1,120 @@
+"""
+Persistent content-addressed cache for response analyses
+"""
+from typing import Any, Dict, List, Optional, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+from loguru import logger
+import orjson
+
+# Analyses stay valid for 30 days
+DEFAULT_TTL_SECONDS = 30 * 86400
+
+class AnalysisCache:
+    """SQLite-backed cache of serialized analyses keyed by a SHA-256 content hash
+    
+    Opening the database, reads and writes all run on a single background
+    thread, so callers on the event loop never wait on disk I/O. Because that
+    thread runs them in submission order, every operation sees the opened
+    database and a lookup issued after set() sees the stored value.
+    """
+    
+    def __init__(self, path: str, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        
+        # One thread keeps opening, reads and writes ordered
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis-cache")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor.submit(self._open)
+    
+    def _open(self) -> None:
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("DELETE FROM analyses WHERE expires_at < ?", (time.time(),))
+        
+        logger.info(f"🗄️ Analysis cache opened at {self.path}")
+    
+    @staticmethod
+    def make_key(
+        question: str,
+        response: str,
+        style: str,
+        experience_level: str,
+        model_name: str
+    ) -> str:
+        """Hash the inputs that determine an analysis"""
+        payload = orjson.dumps(
+            {
+                "question": question,
+                "response": response,
+                "style": style,
+                "experience_level": experience_level,
+                "model": model_name
+            },
+            option=orjson.OPT_SORT_KEYS
+        )
+        return hashlib.sha256(payload).hexdigest()
+    
+    async def get(self, key: str) -> Optional[str]:
+        return (await self.get_many([key]))[0]
+    
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[str]]:
+        """Look up several keys in one query; results are in key order"""
+        loop = asyncio.get_running_loop()
+        found = await loop.run_in_executor(self._executor, self._read, list(keys))
+        values = [found.get(key) for key in keys]
+        hits = sum(value is not None for value in values)
+        self.hits += hits
+        self.misses += len(values) - hits
+        return values
+    
+    def _read(self, keys: List[str]) -> Dict[str, str]:
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        rows = self._conn.execute(
+            f"SELECT key, value FROM analyses WHERE key IN ({placeholders}) AND expires_at >= ?",
+            (*keys, time.time())
+        ).fetchall()
+        return dict(rows)
+    
+    def set(self, key: str, value: str) -> None:
+        self._executor.submit(self._write, key, value, time.time() + self.ttl_seconds)
+    
+    def _write(self, key: str, value: str, expires_at: float) -> None:
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+        except sqlite3.Error as error:
+            logger.warning(f"[AnalysisCache] Write failed: {error}")
+    
+    async def flush(self) -> None:
+        """Wait until queued writes are on disk"""
+        await asyncio.get_running_loop().run_in_executor(self._executor, lambda: None)
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+@cache
+def get_analysis_cache() -> AnalysisCache:
+    """Process-wide analysis cache; the location is set by ANALYSIS_CACHE_PATH"""
+    return AnalysisCache(os.getenv("ANALYSIS_CACHE_PATH", "analysis_cache.sqlite3"))
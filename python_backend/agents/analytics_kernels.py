@@ -0,0 +1,128 @@
+"""
+Vectorized scoring kernels and columnar storage for response analytics
+"""
+from typing import Any, Dict, List, Sequence, Tuple
+from dataclasses import dataclass
+import re
+import numpy as np
+
+# Case-insensitive hedge check without allocating a lowercased copy of the response
+find_i_think = re.compile(r"i think", re.IGNORECASE).search
+
+# Row order of the score matrix returned by score_batch
+SCORE_DIMENSIONS = ("clarity", "structure", "technical", "communication", "confidence", "relevance")
+
+def fallback_scores(response: str, technical_style: bool) -> Tuple[Tuple[int, ...], int]:
+    """Heuristic scores for one response: the six dimensions in SCORE_DIMENSIONS order and the overall score"""
+    response_length = len(response)
+    
+    clarity = min(95, max(60, 70 + (response_length / 50)))
+    structure = 75 if '.' in response and response_length > 50 else 65
+    technical = 70 if technical_style else 75
+    communication = min(90, max(60, 65 + (response_length / 40)))
+    confidence = 65 if find_i_think(response) else 75
+    relevance = 75
+    
+    overall_score = round((clarity + structure + technical + communication + confidence + relevance) / 6)
+    dimensions = (clarity, structure, technical, communication, confidence, relevance)
+    return tuple(round(value) for value in dimensions), overall_score
+
+def response_features(responses: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Extract the per-response inputs of score_batch as parallel arrays"""
+    count = len(responses)
+    lengths = np.fromiter(map(len, responses), dtype=np.float64, count=count)
+    has_period = np.fromiter(("." in response for response in responses), dtype=np.bool_, count=count)
+    has_i_think = np.fromiter((find_i_think(response) is not None for response in responses), dtype=np.bool_, count=count)
+    return lengths, has_period, has_i_think
+
+def score_batch(
+    lengths: np.ndarray,
+    has_period: np.ndarray,
+    has_i_think: np.ndarray,
+    technical_style: bool
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Score N responses at once
+    
+    Returns the unrounded (6, N) dimension matrix in SCORE_DIMENSIONS order and
+    the rounded (N,) overall scores.
+    """
+    clarity = np.clip(70 + lengths / 50, 60, 95)
+    structure = np.where(has_period & (lengths > 50), 75.0, 65.0)
+    technical = np.full_like(lengths, 70.0 if technical_style else 75.0)
+    communication = np.clip(65 + lengths / 40, 60, 90)
+    confidence = np.where(has_i_think, 65.0, 75.0)
+    relevance = np.full_like(lengths, 75.0)
+    
+    scores = np.stack((clarity, structure, technical, communication, confidence, relevance))
+    return scores, np.rint(scores.mean(axis=0))
+
+
+_ANALYZED_AT = "2024-01-01T00:00:00Z"
+
+@dataclass
+class AnalysisColumns:
+    """Per-response analyses stored column-wise, one position per response in interview order"""
+    question_ids: List[str]
+    questions: List[str]
+    responses: List[str]
+    timestamps: List[int]
+    analyses: List[Dict[str, Any]]
+    fallback: np.ndarray
+    scores: np.ndarray
+    dimensions: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.question_ids)
+    
+    @classmethod
+    def from_entries(cls, entries: Sequence[Dict[str, Any]]) -> "AnalysisColumns":
+        """Build columns from per-response entry dicts (missing scores default to 70)"""
+        count = len(entries)
+        analyses = [entry["analysis"] for entry in entries]
+        return cls(
+            question_ids=[entry["question_id"] for entry in entries],
+            questions=[entry["question"] for entry in entries],
+            responses=[entry["response"] for entry in entries],
+            timestamps=[entry["timestamp"] for entry in entries],
+            analyses=analyses,
+            fallback=np.fromiter(
+                (entry["metadata"].get("fallback", False) for entry in entries),
+                dtype=np.bool_,
+                count=count
+            ),
+            scores=np.fromiter(
+                (analysis.get("score", 70) for analysis in analyses),
+                dtype=np.float64,
+                count=count
+            ),
+            dimensions=np.fromiter(
+                (
+                    analysis.get("response_analysis", {}).get(key, 70)
+                    for key in SCORE_DIMENSIONS
+                    for analysis in analyses
+                ),
+                dtype=np.float64,
+                count=count * len(SCORE_DIMENSIONS)
+            ).reshape(len(SCORE_DIMENSIONS), count)
+        )
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Row-wise view for serialization and LLM prompts"""
+        return [
+            {
+                "question_id": question_id,
+                "question": question,
+                "response": response,
+                "timestamp": timestamp,
+                "analysis": analysis,
+                "metadata": {"fallback": True, "analyzed_at": _ANALYZED_AT} if fallback else {"analyzed_at": _ANALYZED_AT}
+            }
+            for question_id, question, response, timestamp, analysis, fallback in zip(
+                self.question_ids,
+                self.questions,
+                self.responses,
+                self.timestamps,
+                self.analyses,
+                self.fallback.tolist()
+            )
+        ]
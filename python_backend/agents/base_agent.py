@@ -1,29 +1,113 @@
 """
 Base agent class using Pydantic AI
 """
-from typing import Any, Dict, Optional, Type, TypeVar, Generic
+from typing import Any, ClassVar, Dict, Optional, Tuple, Type, TypeVar, Generic
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import date, datetime
+import hashlib
+import time
 from pydantic import BaseModel
 from pydantic_ai import Agent, RunContext
 from loguru import logger
-import json
+import msgspec
+import orjson
 
 T = TypeVar('T', bound=BaseModel)
 
+# Prompts use compact JSON with sorted keys: indentation only inflates the token count
+# billed per call, and sorted keys keep identical payloads byte-identical
+_PROMPT_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+# Context/input keys whose values stay the same across calls within an interview
+STATIC_PROMPT_KEYS = frozenset({"config", "interview_context", "topic_analysis"})
+
+def _json_default(obj: Any) -> Any:
+    """Serialize values orjson does not handle natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, msgspec.Struct):
+        return msgspec.to_builtins(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps_prompt(obj: Any) -> str:
+    """Serialize a prompt payload to compact JSON text"""
+    return orjson.dumps(obj, default=_json_default, option=_PROMPT_JSON_OPTIONS).decode()
+
+def dumps_pretty(obj: Any) -> str:
+    """Serialize a payload to indented JSON text for logs"""
+    return orjson.dumps(obj, default=_json_default, option=_PROMPT_JSON_OPTIONS | orjson.OPT_INDENT_2).decode()
+
+class ResultCache:
+    """TTL-bounded cache of agent results keyed by normalized prompt text"""
+    
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, BaseModel]]" = OrderedDict()
+    
+    @staticmethod
+    def make_key(namespace: str, prompt: str) -> Tuple[str, str]:
+        """Build a cache key; whitespace differences map to the same entry, case is significant"""
+        normalized = " ".join(prompt.split())
+        return namespace, hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    
+    def get(self, key: Tuple[str, str]) -> Optional[BaseModel]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: Tuple[str, str], value: BaseModel) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def clear(self, namespace: Optional[str] = None) -> None:
+        if namespace is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[0] == namespace]:
+            del self._entries[key]
+
 class BaseAgent(ABC, Generic[T]):
     """Base agent class for interview system using Pydantic AI"""
     
+    # Subclasses must declare __slots__ = () as well to stay dict-free
+    __slots__ = ("name", "model_name", "memory", "agent")
+    
+    # Process-wide Pydantic AI agents keyed by (agent class, model name)
+    _agent_cache: ClassVar[Dict[Tuple[type, str], Agent]] = {}
+    
+    # Successful LLM results shared by all agents, namespaced by agent name
+    _result_cache: ClassVar[ResultCache] = ResultCache()
+    
     def __init__(self, name: str, model_name: str = "gemini-2.5-flash"):
         self.name = name
         self.model_name = model_name
         self.memory: Dict[str, Any] = {}
         
-        # Create Pydantic AI agent
-        self.agent = Agent(
-            model=model_name,
-            result_type=self.get_result_type(),
-            system_prompt=self.get_system_prompt()
-        )
+        # Reuse the Pydantic AI agent for this class/model, creating it on first use
+        cache_key = (type(self), model_name)
+        agent = BaseAgent._agent_cache.get(cache_key)
+        if agent is None:
+            agent = Agent(
+                model=model_name,
+                result_type=self.get_result_type(),
+                system_prompt=self.get_system_prompt()
+            )
+            BaseAgent._agent_cache[cache_key] = agent
+        self.agent = agent
         
         logger.info(f"🤖 Initialized {self.name} with model {model_name}")
     
@@ -37,10 +121,35 @@ class BaseAgent(ABC, Generic[T]):
         """Get the system prompt for this agent"""
         pass
     
-    async def execute(self, input_data: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> T:
-        """Execute the agent with input data"""
+    async def execute(
+        self,
+        input_data: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+        no_cache: bool = False
+    ) -> T:
+        """Execute the agent with input data
+        
+        Results are cached per agent name for an hour; prompts that only differ
+        in whitespace share an entry, while case is significant. Pass
+        no_cache=True to force a call.
+        Cached results are shared instances and must not be mutated.
+        """
+        result, _ = await self.execute_with_status(input_data, context, no_cache)
+        return result
+    
+    async def execute_with_status(
+        self,
+        input_data: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+        no_cache: bool = False
+    ) -> Tuple[T, bool]:
+        """Like execute, but also report whether the result came from the model (False for fallbacks)"""
         try:
-            logger.info(f"[{self.name}] Executing with input keys: {list(input_data.keys())}")
+            logger.opt(lazy=True).info(
+                "[{}] Executing with input keys: {}",
+                lambda: self.name,
+                lambda: list(input_data.keys())
+            )
             
             # Store context in memory
             if context:
@@ -48,25 +157,61 @@ class BaseAgent(ABC, Generic[T]):
             
             # Prepare the prompt
             prompt = self.prepare_prompt(input_data, context or {})
+            logger.opt(lazy=True).debug(
+                "[{}] Prompt input:\n{}",
+                lambda: self.name,
+                lambda: dumps_pretty(input_data)
+            )
+            
+            cache_key = ResultCache.make_key(self.name, prompt)
+            if not no_cache:
+                cached = BaseAgent._result_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"[{self.name}] Returning cached result")
+                    return cached, True
             
             # Run the agent
             result = await self.agent.run(prompt)
+            BaseAgent._result_cache.set(cache_key, result.data)
             
             logger.info(f"[{self.name}] Execution completed successfully")
-            return result.data
+            return result.data, True
             
         except Exception as error:
             logger.error(f"[{self.name}] Execution error: {error}")
-            return self.generate_fallback_result(input_data, context or {})
+            return self.generate_fallback_result(input_data, context or {}), False
     
     def prepare_prompt(self, input_data: Dict[str, Any], context: Dict[str, Any]) -> str:
-        """Prepare the prompt for the agent"""
+        """Prepare the prompt for the agent
+        
+        Sections are ordered static-first, dynamic-last so consecutive calls share
+        the longest possible prefix for provider-side prompt caching:
+        
+        1. Reference: values under STATIC_PROMPT_KEYS from context and input
+        2. Context: the remaining (volatile) context
+        3. Input: the remaining input data
+        
+        All sections are serialized with sorted keys and must not contain
+        timestamps or other per-call values in the Reference block.
+        """
         prompt_parts = []
         
+        static_data = {key: context[key] for key in STATIC_PROMPT_KEYS.intersection(context)}
+        static_data.update((key, input_data[key]) for key in STATIC_PROMPT_KEYS.intersection(input_data))
+        
+        if static_data:
+            prompt_parts.append(f"Reference: {dumps_prompt(static_data)}")
+        
         if context:
-            prompt_parts.append(f"Context: {json.dumps(context, indent=2)}")
+            if STATIC_PROMPT_KEYS.isdisjoint(context):
+                prompt_parts.append(f"Context: {dumps_prompt(context)}")
+            else:
+                volatile_context = {k: v for k, v in context.items() if k not in STATIC_PROMPT_KEYS}
+                if volatile_context:
+                    prompt_parts.append(f"Context: {dumps_prompt(volatile_context)}")
         
-        prompt_parts.append(f"Input: {json.dumps(input_data, indent=2)}")
+        volatile_input = {k: v for k, v in input_data.items() if k not in STATIC_PROMPT_KEYS}
+        prompt_parts.append(f"Input: {dumps_prompt(volatile_input)}")
         
         return "\n\n".join(prompt_parts)
     
@@ -87,9 +232,21 @@ class BaseAgent(ABC, Generic[T]):
         """Generate fallback result when agent execution fails"""
         pass
 
-class AgentContext(BaseModel):
-    """Context for agent execution"""
+class AgentContext(msgspec.Struct):
+    """Context for agent execution (internal helper type, no validation)"""
     session_id: Optional[str] = None
     user_id: Optional[str] = None
     timestamp: Optional[str] = None
-    metadata: Dict[str, Any] = {}
\ No newline at end of file
+    metadata: Dict[str, Any] = {}
+    
+    def encode(self) -> bytes:
+        """Serialize to JSON bytes"""
+        return _context_encoder.encode(self)
+    
+    @classmethod
+    def decode(cls, data: bytes) -> "AgentContext":
+        """Deserialize from JSON bytes"""
+        return _context_decoder.decode(data)
+
+_context_encoder = msgspec.json.Encoder()
+_context_decoder = msgspec.json.Decoder(AgentContext)
\ No newline at end of file
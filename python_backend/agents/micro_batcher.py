@@ -0,0 +1,97 @@
+"""
+Micro-batcher that coalesces concurrent response analyses into batched LLM calls
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import os
+from loguru import logger
+import orjson
+
+from models.interview_models import InterviewConfig
+
+BatchHandler = Callable[[List[Dict[str, Any]], InterviewConfig], Awaitable[List[Any]]]
+
+class MicroBatcher:
+    """
+    Collects submissions for up to `window` seconds (or until `max_batch` are queued)
+    and hands each batch to the handler, one call per distinct interview config.
+    A new batch starts forming while the previous one is still in flight.
+    """
+    
+    def __init__(
+        self,
+        handler: BatchHandler,
+        max_batch: Optional[int] = None,
+        window: Optional[float] = None
+    ):
+        self.handler = handler
+        self.max_batch = max_batch or int(os.getenv("MAX_BATCH", "8"))
+        self.window = window if window is not None else float(os.getenv("BATCH_WINDOW_MS", "20")) / 1000
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Set[asyncio.Task] = set()
+    
+    async def submit(self, question: str, response: str, config: InterviewConfig) -> Any:
+        """Queue one question/response pair and wait for its analysis"""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put(({"question": question, "response": response}, config, future))
+        return await future
+    
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._collect())
+    
+    async def _collect(self) -> None:
+        """Form batches from the queue and dispatch them without waiting for completion"""
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = self._loop.time() + self.window
+            
+            while len(batch) < self.max_batch:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            task = self._loop.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+    
+    async def _dispatch(self, batch: List[Tuple[Dict[str, Any], InterviewConfig, asyncio.Future]]) -> None:
+        # The config is part of the prompt, so items only share a call when their configs match
+        groups: Dict[bytes, List[Tuple[Dict[str, Any], InterviewConfig, asyncio.Future]]] = {}
+        for entry in batch:
+            groups.setdefault(orjson.dumps(entry[1].dumped, option=orjson.OPT_SORT_KEYS), []).append(entry)
+        
+        await asyncio.gather(*(self._run_group(group) for group in groups.values()))
+    
+    async def _run_group(self, group: List[Tuple[Dict[str, Any], InterviewConfig, asyncio.Future]]) -> None:
+        # Items come from unrelated requests, so each gets a number that is unique within this call
+        items = [{**item, "question_number": number} for number, (item, _, _) in enumerate(group, 1)]
+        failure: BaseException = RuntimeError("Batch returned no analysis for this item")
+        try:
+            results = await self.handler(items, group[0][1])
+            for (_, _, future), result in zip(group, results):
+                if not future.done():
+                    future.set_result(result)
+        except asyncio.CancelledError:
+            failure = RuntimeError("Batch dispatch was cancelled")
+            raise
+        except Exception as error:
+            logger.error(f"[MicroBatcher] Batch of {len(items)} failed: {error}")
+            failure = error
+        finally:
+            # Nobody may be left waiting, whatever happened to the call
+            for _, _, future in group:
+                if not future.done():
+                    future.set_exception(failure)
@@ -1,37 +1,159 @@
 """
 Agentic Orchestrator using Pydantic AI
 """
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, FrozenSet, Optional, Sequence, Set, Tuple
+from collections import OrderedDict, defaultdict
+from functools import cache, lru_cache
+from itertools import islice
 from loguru import logger
 import asyncio
+import orjson
+import sys
 
 from .topic_analysis_agent import TopicAnalysisAgent
-from .question_generation_agent import QuestionGenerationAgent
+from .question_generation_agent import QuestionGenerationAgent, fallback_questions
 from models.interview_models import InterviewConfig, InterviewResponse, TopicAnalysis
 
+# Eviction weights: topic analyses cost an LLM call to rebuild, session state is cheap
+_IMPORTANCE_TOPIC_ANALYSIS = 1.0
+_IMPORTANCE_SESSION_STATE = 0.3
+_EVICTION_WINDOW = 8
+
+# Immutable default for optional sequence arguments
+_EMPTY_LIST: Tuple = ()
+
+FOLLOWUP_PLACEHOLDER = "Can you elaborate on that point a bit more?"
+
+# Styles with a fixed question type; other styles depend on the question number
+_STYLE_TO_TYPE: Dict[str, str] = {
+    "behavioral": "scenario",
+    "case-study": "problem-solving"
+}
+
+# Difficulty indexed by [question stage][is fresher]; stages are question 1, question 2, later
+_DIFFICULTY: Tuple[Tuple[str, str], ...] = (
+    ("easy", "easy"),
+    ("medium", "medium"),
+    ("hard", "medium")
+)
+
+_FALLBACK_TEMPLATES: Dict[str, Tuple[str, ...]] = {
+    "technical": (
+        "What are the key concepts and best practices in {topic}?",
+        "How would you approach solving a complex problem using {topic}?",
+        "Explain the architecture and design patterns you would use for a {topic} project.",
+        "What are the performance considerations when working with {topic}?",
+        "How do you ensure code quality and maintainability in {topic} development?"
+    ),
+    "hr": (
+        "Why are you passionate about working with {topic}?",
+        "How do you stay current with developments in {topic}?",
+        "Describe your experience and growth in {topic}.",
+        "What challenges have you faced while working with {topic}?",
+        "How do you see your career developing in the {topic} field?"
+    ),
+    "behavioral": (
+        "Tell me about a successful project you completed using {topic}.",
+        "Describe a time when you had to learn {topic} quickly for a project.",
+        "How did you handle a difficult technical challenge involving {topic}?",
+        "Tell me about a time you had to collaborate with others on a {topic} project.",
+        "Describe how you've improved your {topic} skills over time."
+    )
+}
+
+@lru_cache(maxsize=128)
+def _fallback_for(topic: str, style: str, question_number: int) -> str:
+    """Format only the fallback template needed for this question"""
+    templates = _FALLBACK_TEMPLATES.get(style, _FALLBACK_TEMPLATES["technical"])
+    index = min(question_number - 1, len(templates) - 1)
+    return templates[index].format(topic=topic)
+
+@lru_cache(maxsize=128)
+def _orchestrator_fallbacks(topic: str) -> FrozenSet[str]:
+    """Every question generate_fallback_question can produce for a topic"""
+    return frozenset(
+        template.format(topic=topic)
+        for templates in _FALLBACK_TEMPLATES.values()
+        for template in templates
+    )
+
+def is_fallback_question(question: str, topic: str) -> bool:
+    """Whether a generated question or follow-up is a template/placeholder rather than model output"""
+    return (
+        question == FOLLOWUP_PLACEHOLDER
+        or question in _orchestrator_fallbacks(topic)
+        or question in fallback_questions(topic)
+    )
+
+@cache
+def _get_topic_agent(model_name: str) -> TopicAnalysisAgent:
+    """Process-wide topic analysis agent for a model"""
+    return TopicAnalysisAgent("TopicAnalysisAgent", model_name)
+
+@cache
+def _get_qgen_agent(model_name: str) -> QuestionGenerationAgent:
+    """Process-wide question generation agent for a model"""
+    return QuestionGenerationAgent("QuestionGenerationAgent", model_name)
+
 class AgenticOrchestrator:
     """
     Agentic Orchestrator using Pydantic AI
     Streamlined workflow with topic analysis and question generation for maximum speed
     """
     
-    def __init__(self, model_name: str = "gemini-1.5-flash"):
+    __slots__ = (
+        "model_name",
+        "followup_timeout",
+        "max_memory_entries",
+        "topic_analysis_agent",
+        "question_generation_agent",
+        "session_memory",
+        "_session_index",
+        "_entry_owner",
+        "_entry_importance",
+        "_pending_topic_analyses",
+        "_entry_sizes",
+        "_memory_bytes"
+    )
+    
+    def __init__(
+        self,
+        model_name: str = "gemini-1.5-flash",
+        followup_timeout: float = 10.0,
+        max_memory_entries: int = 10_000
+    ):
         self.model_name = model_name
+        self.followup_timeout = followup_timeout
+        self.max_memory_entries = max_memory_entries
         
-        # Initialize only essential agents for speed
-        self.topic_analysis_agent = TopicAnalysisAgent("TopicAnalysisAgent", model_name)
-        self.question_generation_agent = QuestionGenerationAgent("QuestionGenerationAgent", model_name)
+        # Initialize only essential agents for speed (shared across orchestrators)
+        self.topic_analysis_agent = _get_topic_agent(model_name)
+        self.question_generation_agent = _get_qgen_agent(model_name)
         
-        # Session memory for maintaining context
-        self.session_memory: Dict[str, Any] = {}
+        # Session memory for maintaining context, kept in least-recently-used order
+        self.session_memory: "OrderedDict[str, Any]" = OrderedDict()
+        
+        # session_id -> session_memory keys written for that session, and the reverse
+        self._session_index: Dict[str, Set[str]] = defaultdict(set)
+        self._entry_owner: Dict[str, str] = {}
+        
+        # Relative regeneration cost of each entry, used to weight LRU eviction
+        self._entry_importance: Dict[str, float] = {}
+        
+        # Topic analyses currently running, keyed like their session_memory entry
+        self._pending_topic_analyses: Dict[str, "asyncio.Future[TopicAnalysis]"] = {}
+        
+        # Running size estimate of session_memory, maintained on every write
+        self._entry_sizes: Dict[str, int] = {}
+        self._memory_bytes = 0
         
         logger.info(f"🤖 Agentic Orchestrator initialized with Pydantic AI (model: {model_name})")
     
     async def generate_question(
         self,
         config: InterviewConfig,
-        previous_questions: List[str] = None,
-        previous_responses: List[InterviewResponse] = None,
+        previous_questions: Sequence[str] = _EMPTY_LIST,
+        previous_responses: Sequence[InterviewResponse] = _EMPTY_LIST,
         question_number: int = 1
     ) -> str:
         """Generate a high-quality, topic-relevant interview question"""
@@ -47,8 +169,8 @@ class AgenticOrchestrator:
             final_question = await self.generate_question_streamlined(
                 topic_analysis=topic_analysis,
                 config=config,
-                previous_questions=previous_questions or [],
-                previous_responses=previous_responses or [],
+                previous_questions=previous_questions or _EMPTY_LIST,
+                previous_responses=previous_responses or _EMPTY_LIST,
                 question_number=question_number
             )
             
@@ -63,7 +185,7 @@ class AgenticOrchestrator:
             return final_question
             
         except Exception as error:
-            logger.error(f"[Orchestrator] Error in question generation: {error}")
+            logger.error("[Orchestrator] Error in question generation: {!r}", error)
             return self.generate_fallback_question(config, question_number)
     
     async def generate_followup(
@@ -72,50 +194,89 @@ class AgenticOrchestrator:
         user_response: str,
         config: InterviewConfig
     ) -> str:
-        """Generate follow-up question based on user response"""
+        """Generate follow-up question based on user response
+        
+        The LLM generation races a latency budget; if it has not finished within
+        followup_timeout seconds it is cancelled and the placeholder is returned.
+        """
         try:
             logger.info("[Orchestrator] Generating follow-up question")
             
-            # Create a simple follow-up using the question generation agent
-            topic_analysis = await self.get_or_create_topic_analysis(config, self.get_session_id(config))
-            
-            question_spec = {
-                "category": "follow-up",
-                "difficulty": "medium",
-                "focus_area": "Response Clarification",
-                "concepts": ["Follow-up", "Clarification"],
-                "question_type": "practical",
-                "context": {
-                    "original_question": original_question,
-                    "user_response": user_response
-                }
-            }
-            
-            result = await self.question_generation_agent.generate_question(
-                question_spec=question_spec,
-                topic_analysis=topic_analysis,
-                config=config
+            return await asyncio.wait_for(
+                self._generate_followup_question(original_question, user_response, config),
+                timeout=self.followup_timeout
             )
             
-            return result.question
-            
+        except asyncio.TimeoutError:
+            logger.warning(f"[Orchestrator] Follow-up generation exceeded {self.followup_timeout}s, using placeholder")
+            return FOLLOWUP_PLACEHOLDER
         except Exception as error:
-            logger.error(f"[Orchestrator] Error generating follow-up: {error}")
-            return "Can you elaborate on that point a bit more?"
+            logger.error("[Orchestrator] Error generating follow-up: {!r}", error)
+            return FOLLOWUP_PLACEHOLDER
+    
+    async def _generate_followup_question(
+        self,
+        original_question: str,
+        user_response: str,
+        config: InterviewConfig
+    ) -> str:
+        """Run topic analysis and question generation for a follow-up"""
+        # Create a simple follow-up using the question generation agent
+        topic_analysis = await self.get_or_create_topic_analysis(config, self.get_session_id(config))
+        
+        question_spec = {
+            "category": "follow-up",
+            "difficulty": "medium",
+            "focus_area": "Response Clarification",
+            "concepts": ["Follow-up", "Clarification"],
+            "question_type": "practical",
+            "context": {
+                "original_question": original_question,
+                "user_response": user_response
+            }
+        }
+        
+        result = await self.question_generation_agent.generate_question(
+            question_spec=question_spec,
+            topic_analysis=topic_analysis,
+            config=config
+        )
+        
+        return result.question
     
     async def get_or_create_topic_analysis(self, config: InterviewConfig, session_id: str) -> TopicAnalysis:
-        """Get or create topic analysis (cached per session)"""
+        """Get or create topic analysis (cached per session)
+        
+        Concurrent callers for the same session share one in-flight analysis.
+        """
         cache_key = f"{session_id}_topic_analysis"
         
-        if cache_key in self.session_memory:
+        cached = self.session_memory.get(cache_key)
+        if cached is not None:
             logger.info("[Orchestrator] Using cached topic analysis")
-            return TopicAnalysis(**self.session_memory[cache_key])
+            self.session_memory.move_to_end(cache_key)
+            # Serialized from a validated model, so validation can be skipped
+            return TopicAnalysis.model_construct(**orjson.loads(cached))
+        
+        pending = self._pending_topic_analyses.get(cache_key)
+        if pending is None:
+            logger.info("[Orchestrator] Performing topic analysis")
+            pending = asyncio.ensure_future(self._run_topic_analysis(config, session_id, cache_key))
+            self._pending_topic_analyses[cache_key] = pending
+            pending.add_done_callback(lambda _: self._pending_topic_analyses.pop(cache_key, None))
+        else:
+            logger.info("[Orchestrator] Joining in-flight topic analysis")
         
-        logger.info("[Orchestrator] Performing topic analysis")
+        # Shielded so a cancelled caller does not cancel the analysis for the others
+        return await asyncio.shield(pending)
+    
+    async def _run_topic_analysis(self, config: InterviewConfig, session_id: str, cache_key: str) -> TopicAnalysis:
+        """Run topic analysis and cache the result"""
         analysis_result = await self.topic_analysis_agent.analyze_topic(config)
         
-        # Cache the analysis
-        self.session_memory[cache_key] = analysis_result.model_dump()
+        # Cache the analysis as compact JSON bytes
+        self.session_memory[cache_key] = orjson.dumps(analysis_result.model_dump())
+        self._track_entry(session_id, cache_key, _IMPORTANCE_TOPIC_ANALYSIS)
         
         return analysis_result
     
@@ -123,8 +284,8 @@ class AgenticOrchestrator:
         self,
         topic_analysis: TopicAnalysis,
         config: InterviewConfig,
-        previous_questions: List[str],
-        previous_responses: List[InterviewResponse],
+        previous_questions: Sequence[str],
+        previous_responses: Sequence[InterviewResponse],
         question_number: int
     ) -> str:
         """Generate question with streamlined approach"""
@@ -149,24 +310,21 @@ class AgenticOrchestrator:
             return generation_result.question
             
         except Exception as error:
-            logger.error(f"[Orchestrator] Streamlined generation failed: {error}")
+            logger.error("[Orchestrator] Streamlined generation failed: {!r}", error)
             return self.generate_fallback_question(config, question_number)
     
     def create_simple_question_spec(
         self,
         topic_analysis: TopicAnalysis,
         config: InterviewConfig,
-        previous_questions: List[str],
+        previous_questions: Sequence[str],
         question_number: int
     ) -> Dict[str, Any]:
         """Create a simple question specification without planning agent"""
         
         # Determine difficulty based on question number and experience level
-        difficulty = "easy"
-        if question_number > 2:
-            difficulty = "medium" if config.experience_level == "fresher" else "hard"
-        elif question_number > 1:
-            difficulty = "medium"
+        stage = 2 if question_number > 2 else 1 if question_number > 1 else 0
+        difficulty = _DIFFICULTY[stage][config.experience_level == "fresher"]
         
         # Select focus area from topic analysis
         focus_areas = topic_analysis.focus_areas or ["General Knowledge"]
@@ -176,13 +334,7 @@ class AgenticOrchestrator:
         concepts = topic_analysis.main_concepts[:2] if topic_analysis.main_concepts else ["Core Concepts"]
         
         # Determine question type based on style and question number
-        question_type = "theoretical"
-        if config.style == "behavioral":
-            question_type = "scenario"
-        elif config.style == "case-study":
-            question_type = "problem-solving"
-        elif question_number > 1:
-            question_type = "practical"
+        question_type = _STYLE_TO_TYPE.get(config.style) or ("practical" if question_number > 1 else "theoretical")
         
         return {
             "category": config.style,
@@ -202,56 +354,70 @@ class AgenticOrchestrator:
         if session_id not in self.session_memory:
             self.session_memory[session_id] = {}
         self.session_memory[session_id].update(data)
+        self._track_entry(session_id, session_id, _IMPORTANCE_SESSION_STATE)
     
-    def generate_fallback_question(self, config: InterviewConfig, question_number: int) -> str:
-        """Generate fallback question"""
-        fallbacks = {
-            "technical": [
-                f"What are the key concepts and best practices in {config.topic}?",
-                f"How would you approach solving a complex problem using {config.topic}?",
-                f"Explain the architecture and design patterns you would use for a {config.topic} project.",
-                f"What are the performance considerations when working with {config.topic}?",
-                f"How do you ensure code quality and maintainability in {config.topic} development?"
-            ],
-            "hr": [
-                f"Why are you passionate about working with {config.topic}?",
-                f"How do you stay current with developments in {config.topic}?",
-                f"Describe your experience and growth in {config.topic}.",
-                f"What challenges have you faced while working with {config.topic}?",
-                f"How do you see your career developing in the {config.topic} field?"
-            ],
-            "behavioral": [
-                f"Tell me about a successful project you completed using {config.topic}.",
-                f"Describe a time when you had to learn {config.topic} quickly for a project.",
-                f"How did you handle a difficult technical challenge involving {config.topic}?",
-                f"Tell me about a time you had to collaborate with others on a {config.topic} project.",
-                f"Describe how you've improved your {config.topic} skills over time."
-            ]
-        }
+    def _track_entry(self, session_id: str, key: str, importance: float) -> None:
+        """Index a session_memory key under its session, refresh the size estimate and evict"""
+        self._session_index[session_id].add(key)
+        self._entry_owner[key] = session_id
+        self._entry_importance[key] = importance
+        self.session_memory.move_to_end(key)
+        
+        value = self.session_memory[key]
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        if isinstance(value, dict):
+            size += sum(sys.getsizeof(v) for v in value.values())
+        
+        self._memory_bytes += size - self._entry_sizes.get(key, 0)
+        self._entry_sizes[key] = size
+        
+        while len(self.session_memory) > self.max_memory_entries:
+            self._remove_entry(self._select_eviction_candidate())
+    
+    def _select_eviction_candidate(self) -> str:
+        """Pick the entry to evict from the least recently used window
         
-        style_questions = fallbacks.get(config.style, fallbacks["technical"])
-        index = min(question_number - 1, len(style_questions) - 1)
+        Each candidate scores importance * (1 + recency rank), where rank 0 is the
+        oldest entry, so an old but expensive topic analysis can outlive a
+        slightly newer, cheap session-state entry. The newest entry is never
+        a candidate.
+        """
+        window = min(_EVICTION_WINDOW, len(self.session_memory) - 1)
+        keys = islice(self.session_memory, max(window, 1))
+        return min(
+            enumerate(keys),
+            key=lambda item: self._entry_importance.get(item[1], _IMPORTANCE_SESSION_STATE) * (item[0] + 1)
+        )[1]
+    
+    def _remove_entry(self, key: str) -> None:
+        """Drop a session_memory entry together with its index and size bookkeeping"""
+        self.session_memory.pop(key, None)
+        self._memory_bytes -= self._entry_sizes.pop(key, 0)
+        self._entry_importance.pop(key, None)
         
-        return style_questions[index]
+        owner = self._entry_owner.pop(key, None)
+        if owner is not None:
+            keys = self._session_index.get(owner)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._session_index[owner]
+    
+    def generate_fallback_question(self, config: InterviewConfig, question_number: int) -> str:
+        """Generate fallback question"""
+        return _fallback_for(config.topic, config.style, question_number)
     
     def clear_session(self, session_id: str) -> None:
         """Clear session memory for a specific session"""
-        keys_to_remove = [key for key in self.session_memory.keys() if key.startswith(session_id)]
-        for key in keys_to_remove:
-            del self.session_memory[key]
+        for key in list(self._session_index.get(session_id, ())):
+            self._remove_entry(key)
     
     def get_session_stats(self) -> Dict[str, Any]:
         """Get session statistics"""
-        active_sessions = set()
-        for key in self.session_memory.keys():
-            if "_" in key:
-                session_id = key.split("_")[0]
-                active_sessions.add(session_id)
-        
         return {
-            "active_sessions": len(active_sessions),
+            "active_sessions": len(self._session_index),
             "total_cached_items": len(self.session_memory),
-            "memory_usage": len(str(self.session_memory)),
+            "memory_bytes_estimate": sys.getsizeof(self.session_memory) + self._memory_bytes,
             "agents_enabled": ["TopicAnalysis", "QuestionGeneration"],
             "planning_enabled": False,
             "validation_enabled": False,
@@ -4,13 +4,18 @@ Overall Analysis Agent using Pydantic AI
 from typing import Type, Dict, Any, List
 from pydantic import BaseModel
 from loguru import logger
+import numpy as np
 
 from .base_agent import BaseAgent
 from models.interview_models import InterviewConfig, ResponseAnalysis, PerformanceAnalytics
 
+_SCORE_KEYS = ("clarity", "structure", "technical", "communication", "confidence", "relevance")
+
 class OverallAnalysisAgent(BaseAgent[PerformanceAnalytics]):
     """Agent for overall interview performance analysis"""
     
+    __slots__ = ()
+    
     def get_result_type(self) -> Type[PerformanceAnalytics]:
         return PerformanceAnalytics
     
@@ -40,7 +45,7 @@ Provide strategic, actionable insights for interview improvement. Focus on:
         """Analyze overall interview performance"""
         input_data = {
             "response_analyses": response_analyses,
-            "config": config.model_dump(),
+            "config": config.dumped,
             "session_metadata": session_metadata
         }
         
@@ -61,12 +66,12 @@ Provide strategic, actionable insights for interview improvement. Focus on:
         
         if not response_analyses:
             # Default analysis when no responses
-            return PerformanceAnalytics(
+            return PerformanceAnalytics.model_construct(
                 overall_score=70,
                 performance_level="fair",
                 strengths=["Shows willingness to participate"],
                 improvements=["Complete more interview questions"],
-                response_analysis=ResponseAnalysis(
+                response_analysis=ResponseAnalysis.model_construct(
                     clarity=70, structure=70, technical=70,
                     communication=70, confidence=70, relevance=70
                 ),
@@ -78,27 +83,33 @@ Provide strategic, actionable insights for interview improvement. Focus on:
                 metadata={"fallback": True, "total_responses": 0}
             )
         
-        # Calculate averages from individual analyses
-        avg_scores = {
-            "clarity": 0, "structure": 0, "technical": 0,
-            "communication": 0, "confidence": 0, "relevance": 0
-        }
+        # Stage per-response scores as (num_responses, 6) and overall scores as (num_responses,)
+        analysis_data_list = [analysis.get("analysis", {}) for analysis in response_analyses]
+        num_responses = len(analysis_data_list)
+        
+        scores_mat = np.fromiter(
+            (
+                data.get("response_analysis", {}).get(key, 70)
+                for data in analysis_data_list
+                for key in _SCORE_KEYS
+            ),
+            dtype=np.float64,
+            count=num_responses * len(_SCORE_KEYS)
+        ).reshape(num_responses, len(_SCORE_KEYS))
+        total_scores = np.fromiter(
+            (data.get("score", 70) for data in analysis_data_list),
+            dtype=np.float64,
+            count=num_responses
+        )
+        
+        avg_scores = dict(zip(_SCORE_KEYS, np.rint(scores_mat.mean(axis=0)).astype(int).tolist()))
+        overall_score = int(np.rint(total_scores.mean()))
         
-        total_score = 0
         all_strengths = []
         all_improvements = []
         question_reviews = []
         
-        for i, analysis in enumerate(response_analyses):
-            analysis_data = analysis.get("analysis", {})
-            scores = analysis_data.get("response_analysis", {})
-            
-            # Accumulate scores
-            for key in avg_scores:
-                avg_scores[key] += scores.get(key, 70)
-            
-            total_score += analysis_data.get("score", 70)
-            
+        for i, (analysis, analysis_data) in enumerate(zip(response_analyses, analysis_data_list)):
             # Collect strengths and improvements
             if analysis_data.get("strengths"):
                 all_strengths.extend(analysis_data["strengths"])
@@ -114,13 +125,6 @@ Provide strategic, actionable insights for interview improvement. Focus on:
                 "feedback": analysis_data.get("feedback", "Good response")
             })
         
-        # Calculate averages
-        num_responses = len(response_analyses)
-        for key in avg_scores:
-            avg_scores[key] = round(avg_scores[key] / num_responses)
-        
-        overall_score = round(total_score / num_responses)
-        
         # Determine performance level
         if overall_score >= 85:
             performance_level = "excellent"
@@ -132,24 +136,24 @@ Provide strategic, actionable insights for interview improvement. Focus on:
             performance_level = "needs_improvement"
         
         # Deduplicate strengths and improvements
-        unique_strengths = list(set(all_strengths))[:3] if all_strengths else [
+        unique_strengths = list(dict.fromkeys(all_strengths))[:3] if all_strengths else [
             "Shows understanding of core concepts",
             "Demonstrates relevant experience",
             "Communicates ideas clearly"
         ]
         
-        unique_improvements = list(set(all_improvements))[:3] if all_improvements else [
+        unique_improvements = list(dict.fromkeys(all_improvements))[:3] if all_improvements else [
             "Provide more specific examples",
             "Structure responses more clearly",
             "Practice confident delivery"
         ]
         
-        return PerformanceAnalytics(
+        return PerformanceAnalytics.model_construct(
             overall_score=overall_score,
             performance_level=performance_level,
             strengths=unique_strengths,
             improvements=unique_improvements,
-            response_analysis=ResponseAnalysis(**avg_scores),
+            response_analysis=ResponseAnalysis.model_construct(**avg_scores),
             trends={
                 "improvement": "consistent",
                 "consistency": "medium",
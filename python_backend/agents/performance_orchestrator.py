@@ -1,26 +1,65 @@
 """
 Performance Analysis Orchestrator using Pydantic AI
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+from bisect import bisect_left
+from collections import defaultdict
 from loguru import logger
+import asyncio
+import numpy as np
 
-from .response_analysis_agent import ResponseAnalysisAgent
+from .analysis_cache import get_analysis_cache
+from .micro_batcher import MicroBatcher
+from .analytics_kernels import SCORE_DIMENSIONS, AnalysisColumns, fallback_scores
+from .response_analysis_agent import FALLBACK_REASONING, ResponseAnalysisAgent, ResponseAnalysisResult
 from .overall_analysis_agent import OverallAnalysisAgent
 from models.interview_models import InterviewConfig, InterviewResponse, PerformanceAnalytics
 
+# Lower score bounds of each performance level, bucketed with np.searchsorted
+_LEVEL_THRESHOLDS = np.array([60.0, 80.0])
+_LEVELS = ("needs_improvement", "fair", "good")
+
+# Response length bins in characters (~256, ~1024 and ~4096 tokens at ~4 chars per token)
+_LENGTH_BINS = (1024, 4096, 16384)
+
+# Draft analyses outside this score band, or with widely spread dimensions, are re-run on the main model
+_DRAFT_SCORE_BAND = (55, 90)
+_DRAFT_MAX_DIMENSION_STD = 12.0
+
+# Fallback scores of an empty response, keyed by whether the interview is technical
+_EMPTY_FALLBACK_SCORES = {technical: fallback_scores("", technical) for technical in (True, False)}
+
 class PerformanceAnalysisOrchestrator:
     """
     Performance Analysis Orchestrator using Pydantic AI
     Coordinates the multi-agent workflow for comprehensive interview performance analysis
     """
     
-    def __init__(self, model_name: str = "gemini-2.5-flash"):
+    def __init__(
+        self,
+        model_name: str = "gemini-2.5-flash",
+        max_concurrency: int = 5,
+        draft_model_name: Optional[str] = None
+    ):
         self.model_name = model_name
+        self.draft_model_name = draft_model_name
+        
+        # Caps concurrent LLM calls so fan-out stays under provider rate limits
+        self.max_concurrency = max_concurrency
+        self._analysis_semaphore = asyncio.Semaphore(max_concurrency)
+        
+        # Coalesces concurrent single-response requests into batched calls
+        self.response_batcher = MicroBatcher(self._analyze_batch_bounded)
         
         # Initialize analysis agents
         self.response_analysis_agent = ResponseAnalysisAgent("ResponseAnalysisAgent", model_name)
         self.overall_analysis_agent = OverallAnalysisAgent("OverallAnalysisAgent", model_name)
         
+        # Optional cheaper model tried first for single responses; disabled when no draft model is set
+        self.draft_response_agent = (
+            ResponseAnalysisAgent("DraftResponseAnalysisAgent", draft_model_name) if draft_model_name else None
+        )
+        
         # Analysis cache for performance
         self.analysis_cache: Dict[str, Any] = {}
         
@@ -43,6 +82,13 @@ class PerformanceAnalysisOrchestrator:
             # Step 2: Generate overall performance analysis
             overall_analysis = await self.generate_overall_analysis(response_analyses, config, responses)
             
+            # Count heuristic per-response analyses so callers can tell partial fallbacks apart
+            fallback_responses = int(response_analyses.fallback.sum())
+            if fallback_responses:
+                overall_analysis = overall_analysis.model_copy(
+                    update={"metadata": {**overall_analysis.metadata, "fallback_responses": fallback_responses}}
+                )
+            
             # Cache the results
             self.analysis_cache[session_id] = overall_analysis
             
@@ -64,11 +110,17 @@ class PerformanceAnalysisOrchestrator:
         try:
             logger.info("[PerformanceOrchestrator] Analyzing single response")
             
-            analysis_result = await self.response_analysis_agent.analyze_response(
-                question=question,
-                response=response,
-                config=config
-            )
+            if self.draft_response_agent is not None:
+                draft_result = await self.draft_response_agent.analyze_response(
+                    question=question,
+                    response=response,
+                    config=config
+                )
+                if self._is_confident_draft(draft_result):
+                    logger.info("[PerformanceOrchestrator] Accepted draft analysis")
+                    return draft_result.model_dump()
+            
+            analysis_result = await self.response_batcher.submit(question, response, config)
             
             return analysis_result.model_dump()
             
@@ -76,55 +128,124 @@ class PerformanceAnalysisOrchestrator:
             logger.error(f"[PerformanceOrchestrator] Error analyzing single response: {error}")
             return self.generate_fallback_response_analysis(response, config)
     
+    @staticmethod
+    def _is_confident_draft(result: ResponseAnalysisResult) -> bool:
+        """Accept a draft only for mid-band scores with consistent dimensions"""
+        if result.reasoning == FALLBACK_REASONING:
+            return False
+        if not _DRAFT_SCORE_BAND[0] <= result.score <= _DRAFT_SCORE_BAND[1]:
+            return False
+        dimensions = np.fromiter(result.response_analysis.model_dump().values(), dtype=np.float64)
+        return float(dimensions.std()) < _DRAFT_MAX_DIMENSION_STD
+    
     async def analyze_individual_responses(
         self,
         responses: List[InterviewResponse],
         config: InterviewConfig
-    ) -> List[Dict[str, Any]]:
+    ) -> AnalysisColumns:
         """Analyze each individual response using the Response Analysis Agent"""
         logger.info(f"[PerformanceOrchestrator] Analyzing {len(responses)} individual responses")
         
-        response_analyses = []
+        # Preallocated so out-of-order batch completions land at their response index
+        entries: List[Optional[Dict[str, Any]]] = [None] * len(responses)
+        async for i, analysis in self.stream_analyses(responses, config):
+            entries[i] = analysis
+        
+        response_analyses = AnalysisColumns.from_entries(entries)
         
+        logger.info(f"[PerformanceOrchestrator] Completed analysis of {len(response_analyses)} responses")
+        return response_analyses
+    
+    async def stream_analyses(
+        self,
+        responses: List[InterviewResponse],
+        config: InterviewConfig
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (response index, analysis) pairs as each batch completes"""
+        # Batch responses of similar length together so one long answer doesn't stall short ones
+        bins: Dict[int, List[int]] = defaultdict(list)
         for i, response in enumerate(responses):
-            try:
-                logger.info(f"[PerformanceOrchestrator] Analyzing response {i + 1}/{len(responses)}")
-                
-                analysis_result = await self.response_analysis_agent.analyze_response(
-                    question=response.question,
-                    response=response.response,
-                    config=config,
-                    question_number=i + 1
-                )
-                
-                response_analyses.append({
-                    "question_id": response.question_id,
-                    "question": response.question,
-                    "response": response.response,
-                    "timestamp": response.timestamp,
-                    "analysis": analysis_result.model_dump(),
-                    "metadata": {"analyzed_at": "2024-01-01T00:00:00Z"}
-                })
+            bins[bisect_left(_LENGTH_BINS, len(response.response))].append(i)
+        
+        tasks = [
+            asyncio.ensure_future(self._analyze_bin(responses, bin_indices, config))
+            for bin_indices in bins.values()
+        ]
+        
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                bin_indices, batch_result = await next_done
                 
-            except Exception as error:
-                logger.error(f"[PerformanceOrchestrator] Error analyzing response {i + 1}: {error}")
+                if isinstance(batch_result, Exception):
+                    logger.error(f"[PerformanceOrchestrator] Error analyzing response batch: {batch_result}")
+                    batch_result = [None] * len(bin_indices)
                 
-                # Add fallback analysis for this response
-                response_analyses.append({
-                    "question_id": response.question_id,
-                    "question": response.question,
-                    "response": response.response,
-                    "timestamp": response.timestamp,
-                    "analysis": self.generate_fallback_response_analysis(response.response, config),
-                    "metadata": {"fallback": True, "analyzed_at": "2024-01-01T00:00:00Z"}
-                })
+                for i, result in zip(bin_indices, batch_result):
+                    yield i, self._build_analysis_entry(responses[i], result, config)
+        finally:
+            # Consumers that stop early must not leave batches running
+            for task in tasks:
+                task.cancel()
+    
+    async def _analyze_bin(
+        self,
+        responses: List[InterviewResponse],
+        bin_indices: List[int],
+        config: InterviewConfig
+    ) -> Tuple[List[int], Any]:
+        items = [
+            {"question_number": i + 1, "question": responses[i].question, "response": responses[i].response}
+            for i in bin_indices
+        ]
+        try:
+            return bin_indices, await self._analyze_batch_bounded(items, config)
+        except Exception as error:
+            return bin_indices, error
+    
+    def _build_analysis_entry(
+        self,
+        response: InterviewResponse,
+        result: Optional[ResponseAnalysisResult],
+        config: InterviewConfig
+    ) -> Dict[str, Any]:
+        if result is None:
+            # Add fallback analysis for this response
+            return {
+                "question_id": response.question_id,
+                "question": response.question,
+                "response": response.response,
+                "timestamp": response.timestamp,
+                "analysis": self.generate_fallback_response_analysis(response.response, config),
+                "metadata": {"fallback": True, "analyzed_at": "2024-01-01T00:00:00Z"}
+            }
         
-        logger.info(f"[PerformanceOrchestrator] Completed analysis of {len(response_analyses)} responses")
-        return response_analyses
+        return {
+            "question_id": response.question_id,
+            "question": response.question,
+            "response": response.response,
+            "timestamp": response.timestamp,
+            "analysis": result.model_dump(),
+            # analyze_batch fills unanswered items with heuristic analyses, which must not pass for model output
+            "metadata": (
+                {"fallback": True, "analyzed_at": "2024-01-01T00:00:00Z"}
+                if result.reasoning == FALLBACK_REASONING
+                else {"analyzed_at": "2024-01-01T00:00:00Z"}
+            )
+        }
+    
+    async def _analyze_batch_bounded(
+        self,
+        items: List[Dict[str, Any]],
+        config: InterviewConfig
+    ) -> List[ResponseAnalysisResult]:
+        """Analyze a batch of responses in one LLM call while holding a concurrency slot"""
+        async with self._analysis_semaphore:
+            logger.opt(lazy=True).debug("[PerformanceOrchestrator] Analyzing batch of {} responses", lambda: len(items))
+            return await self.response_analysis_agent.analyze_batch(items, config)
     
     async def generate_overall_analysis(
         self,
-        response_analyses: List[Dict[str, Any]],
+        response_analyses: AnalysisColumns,
         config: InterviewConfig,
         responses: List[InterviewResponse]
     ) -> PerformanceAnalytics:
@@ -132,16 +253,27 @@ class PerformanceAnalysisOrchestrator:
         logger.info("[PerformanceOrchestrator] Generating overall performance analysis")
         
         try:
+            # Single pass over the responses for all per-session aggregates
+            total_questions = len(responses)
+            total_duration = 0
+            average_response_time = 0
+            if total_questions:
+                total_response_time = 0
+                for r in responses:
+                    total_response_time += r.duration or 0
+                total_duration = responses[-1].timestamp - responses[0].timestamp
+                average_response_time = total_response_time / total_questions
+            
             session_metadata = {
-                "total_questions": len(responses),
-                "total_duration": responses[-1].timestamp - responses[0].timestamp if responses else 0,
-                "average_response_time": sum(r.duration or 0 for r in responses) / len(responses) if responses else 0,
+                "total_questions": total_questions,
+                "total_duration": total_duration,
+                "average_response_time": average_response_time,
                 "interview_style": config.style,
                 "experience_level": config.experience_level
             }
             
             overall_result = await self.overall_analysis_agent.analyze_overall_performance(
-                response_analyses=response_analyses,
+                response_analyses=response_analyses.to_dicts(),
                 config=config,
                 session_metadata=session_metadata
             )
@@ -154,51 +286,46 @@ class PerformanceAnalysisOrchestrator:
     
     def generate_fallback_response_analysis(self, response: str, config: InterviewConfig) -> Dict[str, Any]:
         """Generate fallback response analysis"""
-        response_length = len(response)
+        technical = config.style == "technical"
+        if response:
+            dimensions, score = fallback_scores(response, technical)
+        else:
+            dimensions, score = _EMPTY_FALLBACK_SCORES[technical]
         
         return {
-            "response_analysis": {
-                "clarity": min(95, max(60, 70 + (response_length / 50))),
-                "structure": 75 if "." in response else 65,
-                "technical": 70 if config.style == "technical" else 75,
-                "communication": min(90, max(60, 65 + (response_length / 40))),
-                "confidence": 65 if "i think" in response.lower() else 75,
-                "relevance": 75
-            },
+            "response_analysis": dict(zip(SCORE_DIMENSIONS, dimensions)),
             "strengths": ["Shows understanding of the topic"],
             "improvements": ["Add more specific examples"],
             "feedback": "Good response with relevant content. Consider adding more specific examples.",
-            "score": 75,
+            "score": score,
             "key_insights": ["Response demonstrates understanding"],
-            "reasoning": "Fallback analysis based on response characteristics"
+            "reasoning": FALLBACK_REASONING
         }
     
     def generate_fallback_overall_analysis(
         self,
-        response_analyses: List[Dict[str, Any]],
+        response_analyses: AnalysisColumns,
         config: InterviewConfig
     ) -> PerformanceAnalytics:
         """Generate fallback overall analysis"""
         from models.interview_models import ResponseAnalysis
         
-        if not response_analyses:
-            avg_score = 70
-        else:
-            avg_score = sum(r.get("analysis", {}).get("score", 70) for r in response_analyses) / len(response_analyses)
+        scores = response_analyses.scores
+        avg_score = float(scores.mean()) if scores.size else 70.0
         
-        performance_level = "good" if avg_score >= 80 else "fair" if avg_score >= 60 else "needs_improvement"
+        performance_level = _LEVELS[int(np.searchsorted(_LEVEL_THRESHOLDS, avg_score, side="right"))]
         
-        return PerformanceAnalytics(
+        return PerformanceAnalytics.model_construct(
             overall_score=round(avg_score),
             performance_level=performance_level,
             strengths=["Shows understanding of core concepts"],
             improvements=["Provide more specific examples"],
-            response_analysis=ResponseAnalysis(
+            response_analysis=ResponseAnalysis.model_construct(
                 clarity=round(avg_score),
-                structure=round(avg_score - 5),
+                structure=max(0, round(avg_score - 5)),
                 technical=round(avg_score),
                 communication=round(avg_score),
-                confidence=round(avg_score - 10),
+                confidence=max(0, round(avg_score - 10)),
                 relevance=round(avg_score)
             ),
             trends={
@@ -227,22 +354,25 @@ class PerformanceAnalysisOrchestrator:
         
         from models.interview_models import ResponseAnalysis
         
-        question_reviews = []
-        for i, response in enumerate(responses):
-            question_reviews.append({
+        # Slight variation per question
+        review_scores = (70 + 5 * np.arange(len(responses))).tolist()
+        question_reviews = [
+            {
                 "question_id": response.question_id,
                 "question": response.question,
                 "response": response.response,
-                "score": 70 + (i * 5),  # Slight variation
+                "score": score,
                 "feedback": "Good response with room for improvement."
-            })
+            }
+            for response, score in zip(responses, review_scores)
+        ]
         
-        return PerformanceAnalytics(
+        return PerformanceAnalytics.model_construct(
             overall_score=75,
             performance_level="fair",
             strengths=["Clear communication", "Good technical understanding"],
             improvements=["Add more specific examples", "Structure responses better"],
-            response_analysis=ResponseAnalysis(
+            response_analysis=ResponseAnalysis.model_construct(
                 clarity=75, structure=70, technical=80,
                 communication=75, confidence=70, relevance=75
             ),
@@ -272,6 +402,7 @@ class PerformanceAnalysisOrchestrator:
         """Get analysis statistics"""
         return {
             "cached_analyses": len(self.analysis_cache),
+            "response_cache": get_analysis_cache().stats(),
             "agents_enabled": ["ResponseAnalysis", "OverallAnalysis"],
             "analysis_method": "agentic",
             "framework": "Pydantic AI"
@@ -1,7 +1,9 @@
 """
 Question Generation Agent using Pydantic AI
 """
-from typing import Type, Dict, Any
+from typing import Type, Dict, Any, FrozenSet, Tuple
+from functools import lru_cache
+import random
 from pydantic import BaseModel
 from loguru import logger
 
@@ -14,9 +16,78 @@ class QuestionResult(BaseModel):
     metadata: QuestionMetadata
     reasoning: str
 
+# Fallback question templates by (style, difficulty); only the chosen one is formatted
+_FALLBACK_TEMPLATES: Dict[Tuple[str, str], Tuple[str, ...]] = {
+    ("technical", "easy"): (
+        "What are the basic concepts of {topic}?",
+        "How would you explain {topic} to a beginner?",
+        "What tools do you use for {topic} development?"
+    ),
+    ("technical", "medium"): (
+        "Describe a challenging problem you solved using {topic}.",
+        "How do you optimize performance in {topic} applications?",
+        "What are the best practices for {topic} development?"
+    ),
+    ("technical", "hard"): (
+        "Design a scalable architecture for a {topic} system.",
+        "How would you handle complex state management in {topic}?",
+        "Explain advanced concepts and patterns in {topic}."
+    ),
+    ("hr", "easy"): (
+        "Why are you interested in {topic}?",
+        "What motivates you to work with {topic}?",
+        "How do you stay updated with {topic} trends?"
+    ),
+    ("hr", "medium"): (
+        "Describe a project where you used {topic} successfully.",
+        "How do you handle challenges when working with {topic}?",
+        "What's your approach to learning new {topic} technologies?"
+    ),
+    ("hr", "hard"): (
+        "How would you lead a team working on {topic} projects?",
+        "What's your vision for the future of {topic}?",
+        "How do you balance innovation and stability in {topic} work?"
+    ),
+    ("behavioral", "easy"): (
+        "Tell me about a time you learned {topic}.",
+        "Describe your experience working with {topic}.",
+        "How do you approach {topic} problems?"
+    ),
+    ("behavioral", "medium"): (
+        "Tell me about a challenging {topic} project you worked on.",
+        "Describe a time you had to debug a complex {topic} issue.",
+        "How did you handle a situation where {topic} requirements changed?"
+    ),
+    ("behavioral", "hard"): (
+        "Tell me about a time you had to make a critical decision about {topic} architecture.",
+        "Describe how you influenced others to adopt {topic} best practices.",
+        "How did you handle a major {topic} system failure?"
+    )
+}
+
+# Determine difficulty based on experience level
+_DIFFICULTY_MAP: Dict[str, str] = {
+    'fresher': 'easy',
+    'junior': 'medium',
+    'mid-level': 'medium',
+    'senior': 'hard',
+    'lead-manager': 'hard'
+}
+
+@lru_cache(maxsize=128)
+def fallback_questions(topic: str) -> FrozenSet[str]:
+    """Every question generate_fallback_result can produce for a topic"""
+    return frozenset(
+        template.format(topic=topic)
+        for templates in _FALLBACK_TEMPLATES.values()
+        for template in templates
+    )
+
 class QuestionGenerationAgent(BaseAgent[QuestionResult]):
     """Agent for generating interview questions"""
     
+    __slots__ = ()
+    
     def get_result_type(self) -> Type[QuestionResult]:
         return QuestionResult
     
@@ -49,7 +120,7 @@ Provide the question text, metadata about the question, and reasoning for why th
         input_data = {
             "question_spec": question_spec,
             "topic_analysis": topic_analysis.model_dump(),
-            "config": config.model_dump()
+            "config": config.dumped
         }
         
         context = {
@@ -69,79 +140,13 @@ Provide the question text, metadata about the question, and reasoning for why th
         
         logger.warning(f"[{self.name}] Using fallback question generation for {topic}")
         
-        fallback_questions = {
-            "technical": {
-                "easy": [
-                    f"What are the basic concepts of {topic}?",
-                    f"How would you explain {topic} to a beginner?",
-                    f"What tools do you use for {topic} development?"
-                ],
-                "medium": [
-                    f"Describe a challenging problem you solved using {topic}.",
-                    f"How do you optimize performance in {topic} applications?",
-                    f"What are the best practices for {topic} development?"
-                ],
-                "hard": [
-                    f"Design a scalable architecture for a {topic} system.",
-                    f"How would you handle complex state management in {topic}?",
-                    f"Explain advanced concepts and patterns in {topic}."
-                ]
-            },
-            "hr": {
-                "easy": [
-                    f"Why are you interested in {topic}?",
-                    f"What motivates you to work with {topic}?",
-                    f"How do you stay updated with {topic} trends?"
-                ],
-                "medium": [
-                    f"Describe a project where you used {topic} successfully.",
-                    f"How do you handle challenges when working with {topic}?",
-                    f"What's your approach to learning new {topic} technologies?"
-                ],
-                "hard": [
-                    f"How would you lead a team working on {topic} projects?",
-                    f"What's your vision for the future of {topic}?",
-                    f"How do you balance innovation and stability in {topic} work?"
-                ]
-            },
-            "behavioral": {
-                "easy": [
-                    f"Tell me about a time you learned {topic}.",
-                    f"Describe your experience working with {topic}.",
-                    f"How do you approach {topic} problems?"
-                ],
-                "medium": [
-                    f"Tell me about a challenging {topic} project you worked on.",
-                    f"Describe a time you had to debug a complex {topic} issue.",
-                    f"How did you handle a situation where {topic} requirements changed?"
-                ],
-                "hard": [
-                    f"Tell me about a time you had to make a critical decision about {topic} architecture.",
-                    f"Describe how you influenced others to adopt {topic} best practices.",
-                    f"How did you handle a major {topic} system failure?"
-                ]
-            }
-        }
-        
-        # Determine difficulty based on experience level
-        difficulty_map = {
-            'fresher': 'easy',
-            'junior': 'medium',
-            'mid-level': 'medium',
-            'senior': 'hard',
-            'lead-manager': 'hard'
-        }
-        
-        difficulty = difficulty_map.get(experience_level, 'medium')
-        style_questions = fallback_questions.get(style, fallback_questions["technical"])
-        difficulty_questions = style_questions.get(difficulty, style_questions["medium"])
-        
-        import random
-        selected_question = random.choice(difficulty_questions)
+        difficulty = _DIFFICULTY_MAP.get(experience_level, 'medium')
+        templates = _FALLBACK_TEMPLATES.get((style, difficulty)) or _FALLBACK_TEMPLATES[("technical", difficulty)]
+        selected_question = templates[random.randrange(len(templates))].format(topic=topic)
         
-        return QuestionResult(
+        return QuestionResult.model_construct(
             question=selected_question,
-            metadata=QuestionMetadata(
+            metadata=QuestionMetadata.model_construct(
                 category=style,
                 difficulty=difficulty,
                 focus_area="General Knowledge",
@@ -1,10 +1,16 @@
 """
 Response Analysis Agent using Pydantic AI
 """
-from typing import Type, Dict, Any
+from typing import Type, Dict, Any, List, Optional
+from collections import Counter
+from functools import cache
+import numpy as np
 from pydantic import BaseModel
 from loguru import logger
+import orjson
 
+from .analysis_cache import AnalysisCache, get_analysis_cache
+from .analytics_kernels import fallback_scores, response_features, score_batch
 from .base_agent import BaseAgent
 from models.interview_models import InterviewConfig, ResponseAnalysis
 
@@ -18,14 +24,72 @@ class ResponseAnalysisResult(BaseModel):
     key_insights: list[str]
     reasoning: str
 
-class ResponseAnalysisAgent(BaseAgent[ResponseAnalysisResult]):
-    """Agent for analyzing interview responses"""
-    
-    def get_result_type(self) -> Type[ResponseAnalysisResult]:
-        return ResponseAnalysisResult
+class BatchAnalysisItem(BaseModel):
+    """Analysis of one batch item, tagged with the question number it answers"""
+    question_number: int
+    analysis: ResponseAnalysisResult
+
+class BatchAnalysisResult(BaseModel):
+    """Analyses for several responses, matched to their items by question number"""
+    items: list[BatchAnalysisItem]
+
+FALLBACK_REASONING = "Fallback analysis based on response characteristics"
+
+def build_fallback_analysis(response: str, style: str) -> ResponseAnalysisResult:
+    """Heuristic response analysis used when the LLM call fails
     
-    def get_system_prompt(self) -> str:
-        return """You are a Response Analysis Agent specialized in evaluating interview responses.
+    Empty responses get a shared prebuilt result, which must not be mutated.
+    """
+    if not response:
+        return _EMPTY_FALLBACKS[style == 'technical']
+    return _score_fallback(response, style)
+
+def _score_fallback(response: str, style: str) -> ResponseAnalysisResult:
+    dimensions, overall_score = fallback_scores(response, style == 'technical')
+    return _fallback_from_scores(*dimensions, overall_score)
+
+def build_fallback_batch(responses: List[str], style: str) -> List[ResponseAnalysisResult]:
+    """Heuristic analyses for many responses, scored in one vectorized pass"""
+    scores, overall_scores = score_batch(*response_features(responses), style == 'technical')
+    rounded = np.rint(scores).astype(int).T.tolist()
+    return [
+        _fallback_from_scores(*dimensions, overall)
+        for dimensions, overall in zip(rounded, overall_scores.astype(int).tolist())
+    ]
+
+def _fallback_from_scores(
+    clarity: int,
+    structure: int,
+    technical: int,
+    communication: int,
+    confidence: int,
+    relevance: int,
+    overall_score: int
+) -> ResponseAnalysisResult:
+    return ResponseAnalysisResult.model_construct(
+        response_analysis=ResponseAnalysis.model_construct(
+            clarity=clarity,
+            structure=structure,
+            technical=technical,
+            communication=communication,
+            confidence=confidence,
+            relevance=relevance
+        ),
+        strengths=["Shows understanding of the topic", "Provides relevant information"],
+        improvements=["Add more specific examples", "Structure response more clearly"],
+        feedback="Good response with relevant content. Consider adding more specific examples and structuring your answer more clearly.",
+        score=overall_score,
+        key_insights=["Response demonstrates basic understanding", "Could benefit from more detailed examples"],
+        reasoning=FALLBACK_REASONING
+    )
+
+# Every dimension is constant for an empty response; only the technical score depends on the style
+_EMPTY_FALLBACKS = {
+    True: _score_fallback("", "technical"),
+    False: _score_fallback("", "hr")
+}
+
+_RESPONSE_ANALYSIS_PROMPT = """You are a Response Analysis Agent specialized in evaluating interview responses.
 
 Your role is to:
 1. Analyze response quality, clarity, and structure
@@ -43,6 +107,21 @@ Analyze the response across these dimensions:
 - Relevance: How well does the response address the question?
 
 Provide specific examples from the response to support your analysis. Focus on actionable feedback that will help the candidate improve."""
+
+_BATCH_RESPONSE_ANALYSIS_PROMPT = _RESPONSE_ANALYSIS_PROMPT + """
+
+You will receive a list of question/response items. Items may come from different candidates and interviews: analyze each one on its own and never compare items or carry anything over between them. Return one entry per item in "items", without skipping any: set "question_number" to the item's question_number and put its analysis in "analysis"."""
+
+class ResponseAnalysisAgent(BaseAgent[ResponseAnalysisResult]):
+    """Agent for analyzing interview responses"""
+    
+    __slots__ = ()
+    
+    def get_result_type(self) -> Type[ResponseAnalysisResult]:
+        return ResponseAnalysisResult
+    
+    def get_system_prompt(self) -> str:
+        return _RESPONSE_ANALYSIS_PROMPT
     
     async def analyze_response(
         self,
@@ -51,11 +130,21 @@ Provide specific examples from the response to support your analysis. Focus on a
         config: InterviewConfig,
         question_number: int = 1
     ) -> ResponseAnalysisResult:
-        """Analyze interview response"""
+        """Analyze interview response, reusing a persisted analysis of the same content
+        
+        The system prompt, config (Reference block) and context are identical for
+        every response in an interview, so only the trailing Input block varies
+        and providers can reuse their cached prefix.
+        """
+        cache_key = self._cache_key(question, response, config)
+        cached = self._decode_cached(await get_analysis_cache().get(cache_key))
+        if cached is not None:
+            return cached
+        
         input_data = {
             "question": question,
             "response": response,
-            "config": config.model_dump(),
+            "config": config.dumped,
             "question_number": question_number
         }
         
@@ -65,7 +154,99 @@ Provide specific examples from the response to support your analysis. Focus on a
             "experience_level": config.experience_level
         }
         
-        return await self.execute(input_data, context)
+        result = await self.execute(input_data, context)
+        self._store_cached(cache_key, result)
+        return result
+    
+    async def analyze_batch(
+        self,
+        items: List[Dict[str, Any]],
+        config: InterviewConfig
+    ) -> List[ResponseAnalysisResult]:
+        """Analyze several responses in a single LLM call
+        
+        Each item needs "question" and "response" keys; "question_number"
+        defaults to its 1-based position. The model's analyses are matched back
+        to items by question number and returned in item order. Items whose
+        number is missing, duplicated or shared with another item get heuristic
+        fallbacks, which are not persisted. Items with a persisted analysis are
+        served from the cache and left out of the prompt.
+        """
+        analyses: List[Optional[ResponseAnalysisResult]] = [None] * len(items)
+        cache_keys = [self._cache_key(item["question"], item["response"], config) for item in items]
+        
+        # One cache query for the whole batch
+        stored = await get_analysis_cache().get_many(cache_keys)
+        
+        batch_items = []
+        pending = []
+        for i, item in enumerate(items):
+            analyses[i] = self._decode_cached(stored[i])
+            if analyses[i] is None:
+                pending.append(i)
+                batch_items.append({
+                    "question_number": item.get("question_number", i + 1),
+                    "question": item["question"],
+                    "response": item["response"]
+                })
+        
+        if not batch_items:
+            return analyses
+        
+        input_data = {
+            "items": batch_items,
+            "config": config.dumped
+        }
+        
+        context = {
+            "analysis_type": "batch_response_analysis",
+            "interview_style": config.style,
+            "experience_level": config.experience_level
+        }
+        
+        batch_agent = _get_batch_agent(self.model_name)
+        result = await batch_agent.execute(input_data, context)
+        
+        # Numbers that occur more than once on either side cannot be matched safely
+        expected = Counter(batch_item["question_number"] for batch_item in batch_items)
+        returned = Counter(item.question_number for item in result.items)
+        by_number = {item.question_number: item.analysis for item in result.items}
+        
+        unmatched = 0
+        for i, batch_item in zip(pending, batch_items):
+            number = batch_item["question_number"]
+            if number in by_number and expected[number] == 1 and returned[number] == 1:
+                analyses[i] = by_number[number]
+                self._store_cached(cache_keys[i], analyses[i])
+            else:
+                analyses[i] = build_fallback_analysis(items[i]["response"], config.style)
+                unmatched += 1
+        
+        unexpected = len(returned.keys() - expected.keys())
+        if unmatched or unexpected:
+            logger.warning(
+                f"[{self.name}] Batch left {unmatched}/{len(batch_items)} items unmatched "
+                f"({unexpected} unexpected question numbers), using fallbacks for them"
+            )
+        
+        return analyses
+    
+    def _cache_key(self, question: str, response: str, config: InterviewConfig) -> str:
+        return AnalysisCache.make_key(question, response, config.style, config.experience_level, self.model_name)
+    
+    def _decode_cached(self, cached: Optional[str]) -> Optional[ResponseAnalysisResult]:
+        if cached is None:
+            return None
+        logger.opt(lazy=True).debug("[{}] Using persisted analysis", lambda: self.name)
+        # Serialized from a validated model, so validation can be skipped
+        data = orjson.loads(cached)
+        data["response_analysis"] = ResponseAnalysis.model_construct(**data["response_analysis"])
+        return ResponseAnalysisResult.model_construct(**data)
+    
+    def _store_cached(self, key: str, result: ResponseAnalysisResult) -> None:
+        # Heuristic fallbacks are cheap to recompute and should not outlive an outage
+        if result.reasoning != FALLBACK_REASONING:
+            get_analysis_cache().set(key, result.model_dump_json())
     
     def generate_fallback_result(self, input_data: Dict[str, Any], context: Dict[str, Any]) -> ResponseAnalysisResult:
         """Generate fallback response analysis"""
@@ -75,31 +256,35 @@ Provide specific examples from the response to support your analysis. Focus on a
         
         logger.warning(f"[{self.name}] Using fallback response analysis")
         
-        # Basic scoring based on response characteristics
-        response_length = len(response)
-        
-        clarity = min(95, max(60, 70 + (response_length / 50)))
-        structure = 75 if '.' in response and response_length > 50 else 65
-        technical = 70 if style == 'technical' else 75
-        communication = min(90, max(60, 65 + (response_length / 40)))
-        confidence = 65 if 'i think' in response.lower() else 75
-        relevance = 75
-        
-        overall_score = round((clarity + structure + technical + communication + confidence + relevance) / 6)
-        
-        return ResponseAnalysisResult(
-            response_analysis=ResponseAnalysis(
-                clarity=round(clarity),
-                structure=round(structure),
-                technical=round(technical),
-                communication=round(communication),
-                confidence=round(confidence),
-                relevance=round(relevance)
-            ),
-            strengths=["Shows understanding of the topic", "Provides relevant information"],
-            improvements=["Add more specific examples", "Structure response more clearly"],
-            feedback="Good response with relevant content. Consider adding more specific examples and structuring your answer more clearly.",
-            score=overall_score,
-            key_insights=["Response demonstrates basic understanding", "Could benefit from more detailed examples"],
-            reasoning="Fallback analysis based on response characteristics"
-        )
\ No newline at end of file
+        return build_fallback_analysis(response, style)
+
+class BatchResponseAnalysisAgent(BaseAgent[BatchAnalysisResult]):
+    """Agent for analyzing several interview responses in one call"""
+    
+    __slots__ = ()
+    
+    def get_result_type(self) -> Type[BatchAnalysisResult]:
+        return BatchAnalysisResult
+    
+    def get_system_prompt(self) -> str:
+        return _BATCH_RESPONSE_ANALYSIS_PROMPT
+    
+    def generate_fallback_result(self, input_data: Dict[str, Any], context: Dict[str, Any]) -> BatchAnalysisResult:
+        """Generate fallback analyses for every item in the batch"""
+        style = input_data.get("config", {}).get("style", "technical")
+        
+        logger.warning(f"[{self.name}] Using fallback batch response analysis")
+        
+        batch_items = input_data.get("items", [])
+        fallbacks = build_fallback_batch([item.get("response", "") for item in batch_items], style)
+        return BatchAnalysisResult.model_construct(
+            items=[
+                BatchAnalysisItem.model_construct(question_number=item.get("question_number"), analysis=fallback)
+                for item, fallback in zip(batch_items, fallbacks)
+            ]
+        )
+
+@cache
+def _get_batch_agent(model_name: str) -> BatchResponseAnalysisAgent:
+    """Shared batch agent per model"""
+    return BatchResponseAnalysisAgent("BatchResponseAnalysisAgent", model_name)
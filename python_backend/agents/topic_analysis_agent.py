@@ -1,16 +1,179 @@
 """
 Topic Analysis Agent using Pydantic AI
 """
-from typing import Type, Dict, Any
+from typing import Type, Dict, Any, List, Mapping, Optional, Sequence, Tuple
+from collections import OrderedDict
+from types import MappingProxyType
+import asyncio
+import hashlib
+import re
 from pydantic_ai import Agent
 from loguru import logger
+import orjson
 
 from .base_agent import BaseAgent
+from .analysis_cache import get_analysis_cache
 from models.interview_models import TopicAnalysis, InterviewConfig
 
+# Fallback analyses for common topics; read-only and shared by every call
+_FALLBACK_MAPPINGS: Mapping[str, Mapping[str, Tuple[str, ...]]] = MappingProxyType({
+    'frontend': MappingProxyType({
+        'main_concepts': ('User Interface', 'User Experience', 'Web Development', 'Client-side Programming'),
+        'skills': ('HTML', 'CSS', 'JavaScript', 'React', 'Vue', 'Angular'),
+        'technologies': ('React', 'Vue.js', 'Angular', 'TypeScript', 'Webpack', 'Sass'),
+        'focus_areas': ('Component Design', 'State Management', 'Performance Optimization', 'Responsive Design'),
+        'relevance_keywords': ('component', 'state', 'props', 'DOM', 'CSS', 'responsive', 'performance')
+    }),
+    'backend': MappingProxyType({
+        'main_concepts': ('Server-side Development', 'API Design', 'Database Management', 'System Architecture'),
+        'skills': ('Node.js', 'Python', 'Java', 'SQL', 'API Development', 'Database Design'),
+        'technologies': ('Express.js', 'Django', 'Spring Boot', 'PostgreSQL', 'MongoDB', 'Redis'),
+        'focus_areas': ('API Design', 'Database Optimization', 'Security', 'Scalability'),
+        'relevance_keywords': ('API', 'database', 'server', 'authentication', 'security', 'scalability')
+    }),
+    'javascript': MappingProxyType({
+        'main_concepts': ('Programming Fundamentals', 'Asynchronous Programming', 'Object-Oriented Programming'),
+        'skills': ('ES6+', 'Async/Await', 'Promises', 'Closures', 'Prototypes'),
+        'technologies': ('Node.js', 'React', 'Express', 'TypeScript'),
+        'focus_areas': ('Language Features', 'Best Practices', 'Performance', 'Modern JavaScript'),
+        'relevance_keywords': ('function', 'async', 'promise', 'closure', 'prototype', 'ES6', 'arrow function')
+    })
+})
+
+_GENERIC_FALLBACK: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    'main_concepts': ('Technical Knowledge', 'Problem Solving', 'Best Practices'),
+    'skills': ('Programming', 'Debugging', 'Testing', 'Documentation'),
+    'technologies': ('Version Control', 'IDEs', 'Testing Frameworks'),
+    'focus_areas': ('Core Concepts', 'Practical Application', 'Industry Standards'),
+    'relevance_keywords': ('code', 'programming', 'development', 'software', 'technical')
+})
+
+# Question complexity by experience level
+_COMPLEXITY_MAP: Mapping[str, str] = MappingProxyType({
+    'fresher': 'low',
+    'junior': 'medium',
+    'mid-level': 'medium',
+    'senior': 'high',
+    'lead-manager': 'high'
+})
+
+# Fallback topic keys in priority order; the first key (not the leftmost match) wins
+_FALLBACK_KEYS = tuple(_FALLBACK_MAPPINGS)
+_FALLBACK_KEY_PRIORITY = {key: index for index, key in enumerate(_FALLBACK_KEYS)}
+
+# One scan of the topic reports, at every position, the highest-priority key starting
+# there (the zero-width lookahead lets matches overlap), so the minimum over all
+# reports is the first key in _FALLBACK_KEYS that occurs anywhere in the topic
+_find_fallback_keys = re.compile("(?=(" + "|".join(map(re.escape, _FALLBACK_KEYS)) + "))").findall
+
+_strip_punctuation = re.compile(r"[^a-z0-9 ]+").sub
+
+def _keyword_tokens(text: str) -> List[str]:
+    return " ".join(_strip_punctuation("", text.lower()).split()).split()
+
+_KEYWORD_FIELDS = ('skills', 'technologies', 'relevance_keywords')
+
+def _build_keyword_masks() -> Tuple[Dict[str, int], Tuple[Tuple[str, int], ...]]:
+    """Give each fallback vocabulary token one bit; a mapping's mask is the OR of its tokens' bits"""
+    bits: Dict[str, int] = {}
+    masks = []
+    for key, mapping in _FALLBACK_MAPPINGS.items():
+        mask = 0
+        for field in _KEYWORD_FIELDS:
+            for keyword in mapping[field]:
+                for token in _keyword_tokens(keyword):
+                    mask |= bits.setdefault(token, 1 << len(bits))
+        masks.append((key, mask))
+    return bits, tuple(masks)
+
+_KEYWORD_BITS, _MAPPING_KEYWORD_MASKS = _build_keyword_masks()
+
+def best_keyword_mapping(topic: str) -> Optional[str]:
+    """Fallback key whose keywords overlap the topic most (ties go to the earlier key), or None"""
+    topic_mask = 0
+    for token in _keyword_tokens(topic):
+        topic_mask |= _KEYWORD_BITS.get(token, 0)
+    if not topic_mask:
+        return None
+    best_key, best_score = None, 0
+    for key, mask in _MAPPING_KEYWORD_MASKS:
+        score = (mask & topic_mask).bit_count()
+        if score > best_score:
+            best_key, best_score = key, score
+    return best_key
+
+def normalize_topic(topic: str) -> str:
+    """Casefold and collapse whitespace; punctuation is kept so 'C', 'C++' and 'C#' stay distinct"""
+    return " ".join(topic.casefold().split())
+
+def _compact_topic(topic: str) -> str:
+    """Normalized topic without spaces, so 'React Native' and 'ReactNative' compare equal"""
+    return topic.replace(" ", "")
+
+class TopicAnalysisCache:
+    """
+    Topic analyses keyed by normalized topic and interview profile.
+    
+    Lookups try an exact in-memory match, then the persistent analysis cache,
+    then a seen topic with the same profile that only differs in spacing.
+    """
+    
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Tuple[str, ...]], TopicAnalysis]" = OrderedDict()
+    
+    @staticmethod
+    def _persist_key(topic: str, profile: Tuple[str, ...]) -> str:
+        # v2: keys made before punctuation was kept in topics may hold another language's analysis
+        payload = orjson.dumps({"kind": "topic_analysis:v2", "topic": topic, "profile": profile})
+        return hashlib.sha256(payload).hexdigest()
+    
+    async def get(self, topic: str, profile: Tuple[str, ...]) -> Optional[TopicAnalysis]:
+        key = (topic, profile)
+        analysis = self._entries.get(key)
+        if analysis is not None:
+            self._entries.move_to_end(key)
+            return analysis
+        
+        try:
+            stored = await get_analysis_cache().get(self._persist_key(topic, profile))
+            if stored is not None:
+                # Serialized from a validated model, so validation can be skipped
+                analysis = TopicAnalysis.model_construct(**orjson.loads(stored))
+                self._remember(key, analysis)
+                return analysis
+        except Exception as error:
+            logger.warning(f"[TopicAnalysisCache] Persistent lookup failed: {error}")
+        
+        compact = _compact_topic(topic)
+        for (cached_topic, cached_profile), cached in reversed(self._entries.items()):
+            if cached_profile == profile and _compact_topic(cached_topic) == compact:
+                return cached
+        return None
+    
+    def set(self, topic: str, profile: Tuple[str, ...], analysis: TopicAnalysis) -> None:
+        self._remember((topic, profile), analysis)
+        try:
+            get_analysis_cache().set(self._persist_key(topic, profile), analysis.model_dump_json())
+        except Exception as error:
+            logger.warning(f"[TopicAnalysisCache] Persistent store failed: {error}")
+    
+    def _remember(self, key: Tuple[str, Tuple[str, ...]], analysis: TopicAnalysis) -> None:
+        self._entries[key] = analysis
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+
+_topic_cache = TopicAnalysisCache()
+
 class TopicAnalysisAgent(BaseAgent[TopicAnalysis]):
     """Agent for analyzing interview topics"""
     
+    __slots__ = ()
+    
     def get_result_type(self) -> Type[TopicAnalysis]:
         return TopicAnalysis
     
@@ -36,6 +199,14 @@ Be thorough and specific to ensure generated questions will be highly relevant."
     
     async def analyze_topic(self, config: InterviewConfig) -> TopicAnalysis:
         """Analyze interview topic"""
+        topic = normalize_topic(config.topic)
+        profile = (config.style, config.experience_level, (config.company_name or "").lower(), self.model_name)
+        cached = await _topic_cache.get(topic, profile)
+        if cached is not None:
+            logger.info(f"[{self.name}] Returning cached topic analysis for: {config.topic}")
+            return cached
+        
+        # Built only on a cache miss; config.dumped is computed once per config
         input_data = {
             "topic": config.topic,
             "style": config.style,
@@ -45,10 +216,39 @@ Be thorough and specific to ensure generated questions will be highly relevant."
         
         context = {
             "analysis_type": "topic_analysis",
-            "interview_context": config.model_dump()
+            "interview_context": config.dumped
         }
         
-        return await self.execute(input_data, context)
+        analysis, from_model = await self.execute_with_status(input_data, context)
+        if from_model:
+            _topic_cache.set(topic, profile, analysis)
+        return analysis
+    
+    async def analyze_topics(
+        self,
+        configs: Sequence[InterviewConfig],
+        max_concurrency: int = 5
+    ) -> List[TopicAnalysis]:
+        """Analyze several interview configs concurrently, in input order
+        
+        Identical configs share one analysis; at most max_concurrency run at once.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def analyze_bounded(config: InterviewConfig) -> TopicAnalysis:
+            async with semaphore:
+                return await self.analyze_topic(config)
+        
+        unique: Dict[bytes, InterviewConfig] = {}
+        keys = []
+        for config in configs:
+            key = orjson.dumps(config.dumped, option=orjson.OPT_SORT_KEYS)
+            unique.setdefault(key, config)
+            keys.append(key)
+        
+        results = await asyncio.gather(*(analyze_bounded(config) for config in unique.values()))
+        by_key = dict(zip(unique, results))
+        return [by_key[key] for key in keys]
     
     def generate_fallback_result(self, input_data: Dict[str, Any], context: Dict[str, Any]) -> TopicAnalysis:
         """Generate fallback topic analysis"""
@@ -58,65 +258,18 @@ Be thorough and specific to ensure generated questions will be highly relevant."
         
         logger.warning(f"[{self.name}] Using fallback analysis for topic: {topic}")
         
-        # Fallback mappings based on common topics
-        fallback_mappings = {
-            'frontend': {
-                'main_concepts': ['User Interface', 'User Experience', 'Web Development', 'Client-side Programming'],
-                'skills': ['HTML', 'CSS', 'JavaScript', 'React', 'Vue', 'Angular'],
-                'technologies': ['React', 'Vue.js', 'Angular', 'TypeScript', 'Webpack', 'Sass'],
-                'focus_areas': ['Component Design', 'State Management', 'Performance Optimization', 'Responsive Design'],
-                'relevance_keywords': ['component', 'state', 'props', 'DOM', 'CSS', 'responsive', 'performance']
-            },
-            'backend': {
-                'main_concepts': ['Server-side Development', 'API Design', 'Database Management', 'System Architecture'],
-                'skills': ['Node.js', 'Python', 'Java', 'SQL', 'API Development', 'Database Design'],
-                'technologies': ['Express.js', 'Django', 'Spring Boot', 'PostgreSQL', 'MongoDB', 'Redis'],
-                'focus_areas': ['API Design', 'Database Optimization', 'Security', 'Scalability'],
-                'relevance_keywords': ['API', 'database', 'server', 'authentication', 'security', 'scalability']
-            },
-            'javascript': {
-                'main_concepts': ['Programming Fundamentals', 'Asynchronous Programming', 'Object-Oriented Programming'],
-                'skills': ['ES6+', 'Async/Await', 'Promises', 'Closures', 'Prototypes'],
-                'technologies': ['Node.js', 'React', 'Express', 'TypeScript'],
-                'focus_areas': ['Language Features', 'Best Practices', 'Performance', 'Modern JavaScript'],
-                'relevance_keywords': ['function', 'async', 'promise', 'closure', 'prototype', 'ES6', 'arrow function']
-            }
-        }
-        
-        # Try to match topic with predefined mappings
-        topic_lower = topic.lower()
-        analysis_data = None
-        
-        for key, mapping in fallback_mappings.items():
-            if key in topic_lower:
-                analysis_data = mapping
-                break
-        
-        # Generic fallback if no match found
-        if not analysis_data:
-            analysis_data = {
-                'main_concepts': ['Technical Knowledge', 'Problem Solving', 'Best Practices'],
-                'skills': ['Programming', 'Debugging', 'Testing', 'Documentation'],
-                'technologies': ['Version Control', 'IDEs', 'Testing Frameworks'],
-                'focus_areas': ['Core Concepts', 'Practical Application', 'Industry Standards'],
-                'relevance_keywords': ['code', 'programming', 'development', 'software', 'technical']
-            }
-        
-        # Determine complexity based on experience level
-        complexity_map = {
-            'fresher': 'low',
-            'junior': 'medium',
-            'mid-level': 'medium',
-            'senior': 'high',
-            'lead-manager': 'high'
-        }
+        # Try to match topic with predefined mappings, then by keyword overlap; lists
+        # are copied so the result can be mutated without touching the shared constants
+        matches = _find_fallback_keys(topic.lower())
+        key = min(matches, key=_FALLBACK_KEY_PRIORITY.__getitem__) if matches else best_keyword_mapping(topic)
+        analysis_data = _FALLBACK_MAPPINGS[key] if key else _GENERIC_FALLBACK
         
-        return TopicAnalysis(
-            main_concepts=analysis_data['main_concepts'],
-            skills=analysis_data['skills'],
-            technologies=analysis_data['technologies'],
-            focus_areas=analysis_data['focus_areas'],
-            complexity=complexity_map.get(experience_level, 'medium'),
+        return TopicAnalysis.model_construct(
+            main_concepts=list(analysis_data['main_concepts']),
+            skills=list(analysis_data['skills']),
+            technologies=list(analysis_data['technologies']),
+            focus_areas=list(analysis_data['focus_areas']),
+            complexity=_COMPLEXITY_MAP.get(experience_level, 'medium'),
             question_categories=[style, 'fundamentals', 'practical'],
-            relevance_keywords=analysis_data['relevance_keywords']
+            relevance_keywords=list(analysis_data['relevance_keywords'])
         )
\ No newline at end of file
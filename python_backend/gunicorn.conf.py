@@ -0,0 +1,61 @@
+"""
+Gunicorn settings for running the API in production
+
+    gunicorn -c gunicorn.conf.py main:app
+
+Use `python main.py` for local development instead (single process, reload
+when ENVIRONMENT=development).
+
+Interview sessions, caches and rate limits live in process memory, so the
+default is a single worker. Only raise WEB_CONCURRENCY behind a load balancer
+with sticky sessions, or once that state moves to a shared store.
+"""
+import os
+import subprocess
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '3001')}"
+
+# One event-loop worker by default: session state is per process and is not shared across workers
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+# Picks uvloop and httptools automatically when they are installed
+worker_class = "uvicorn.workers.UvicornWorker"
+worker_connections = 1000
+backlog = 2048
+keepalive = 5
+timeout = 120
+graceful_timeout = 30
+
+loglevel = "info"
+accesslog = "-"
+
+# The master runs the single LiveKit agent worker, so application workers must not start their own
+AGENT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "livekit_voice_agent.py")
+os.environ["AGENT_WORKER_EXTERNAL"] = "1"
+
+_agent_worker = None
+
+def on_starting(server):
+    """Start the LiveKit agent worker when LiveKit is configured; it logs to the master's stdout/stderr"""
+    global _agent_worker
+    if not all(os.getenv(name) for name in ("LIVEKIT_API_KEY", "LIVEKIT_API_SECRET", "LIVEKIT_WS_URL")):
+        return
+    _agent_worker = subprocess.Popen(
+        [sys.executable, AGENT_SCRIPT, "start"],
+        close_fds=True
+    )
+    server.log.info(f"LiveKit agent worker started (pid {_agent_worker.pid})")
+
+def on_exit(server):
+    """Stop the LiveKit agent worker"""
+    if _agent_worker is None or _agent_worker.poll() is not None:
+        return
+    _agent_worker.terminate()
+    try:
+        _agent_worker.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        server.log.warning("LiveKit agent worker did not exit in time; killing it")
+        _agent_worker.kill()
@@ -2,112 +2,309 @@
 LiveKit Voice Agent: Joins a LiveKit room as an AI agent and converses using LLM and TTS.
 Docs: https://docs.livekit.io/agents/start/voice-ai/
 """
-import time
+import asyncio
+import importlib
+import inspect
+import json
 import os
+import sys
+from dataclasses import asdict, dataclass, replace
+from functools import lru_cache
+from string import Template
+from typing import Optional
+import aiohttp
+import numpy as np
 from dotenv import load_dotenv
 
 from livekit import agents
-from livekit.agents import Agent, AgentSession, RoomInputOptions, JobProcess, WorkerOptions
+from livekit.agents import Agent, AgentSession, ChatContext, RoomInputOptions, JobProcess, WorkerOptions
 
-# Import plugins from their specific packages
-try:
-    from livekit.plugins.openai import LLM as OpenAILLM
-except ImportError:
-    print("livekit-plugins-openai not installed. Install with: pip install livekit-plugins-openai")
-    exit(1)
+# Plugins register themselves with the worker on import, which livekit requires to happen
+# on the main thread before the worker starts, so they cannot be imported on first use.
+# A missing plugin is reported here instead of exiting, and only required plugins stop
+# the worker from starting (see REQUIRED_PLUGINS below).
+MISSING_PLUGINS: dict = {}
 
-try:
-    from livekit.plugins.cartesia import TTS as CartesiaTTS
-except ImportError:
-    print("livekit-plugins-cartesia not installed. Install with: pip install livekit-plugins-cartesia")
-    exit(1)
 
-try:
-    from livekit.plugins.gladia import STT as GladiaSTT
-except ImportError:
-    print("livekit-plugins-gladia not installed. Install with: pip install livekit-plugins-gladia")
-    exit(1)
+def load_plugin(module: str, attribute: str, package: str):
+    """Import a class from a livekit plugin package, or return None (with a warning) if it is missing"""
+    try:
+        return getattr(importlib.import_module(module), attribute)
+    except ImportError:
+        print(f"{package} not installed. Install with: pip install {package}")
+        MISSING_PLUGINS[attribute] = package
+        return None
 
-try:
-    from livekit.plugins.silero import VAD as SileroVAD
-except ImportError:
-    print("livekit-plugins-silero not installed. Install with: pip install livekit-plugins-silero")
-    exit(1)
 
-try:
-    from livekit.plugins.noise_cancellation import BVC
-except ImportError:
-    print("livekit-plugins-noise-cancellation not installed. Install with: pip install livekit-plugins-noise-cancellation")
-    BVC = None
+OpenAILLM = load_plugin("livekit.plugins.openai", "LLM", "livekit-plugins-openai")
+CartesiaTTS = load_plugin("livekit.plugins.cartesia", "TTS", "livekit-plugins-cartesia")
+GladiaSTT = load_plugin("livekit.plugins.gladia", "STT", "livekit-plugins-gladia")
+SileroVAD = load_plugin("livekit.plugins.silero", "VAD", "livekit-plugins-silero")
+BVC = load_plugin("livekit.plugins.noise_cancellation", "BVC", "livekit-plugins-noise-cancellation")
+MultilingualModel = load_plugin(
+    "livekit.plugins.turn_detector.multilingual", "MultilingualModel", "livekit-plugins-turn-detector"
+)
+
+# Everything except noise cancellation is needed to run a session
+REQUIRED_PLUGINS = ("LLM", "TTS", "STT", "VAD", "MultilingualModel")
 
 try:
-    from livekit.plugins.turn_detector.multilingual import MultilingualModel
+    import uvloop
 except ImportError:
-    print("livekit-plugins-turn-detector not installed. Install with: pip install livekit-plugins-turn-detector")
-    exit(1)
+    # Not available on Windows; the default asyncio loop is used there
+    uvloop = None
 
 load_dotenv()
 
+# The worker and its job processes create their loops with asyncio.new_event_loop(),
+# so installing the policy at import time covers both
+if uvloop is not None:
+    uvloop.install()
+
+# Start LLM generation on interim transcripts so STT, LLM and TTS overlap (livekit-agents >= 1.2)
+SESSION_OPTIONS = (
+    {"preemptive_generation": True}
+    if "preemptive_generation" in inspect.signature(AgentSession.__init__).parameters
+    else {}
+)
+
+
+@dataclass(frozen=True)
+class InterviewEnv:
+    """Interview details the backend passes to this worker through INTERVIEW_* variables"""
+    technology: Optional[str] = None
+    company: Optional[str] = None
+    experience_level: Optional[str] = None
+    duration_minutes: Optional[float] = None
+
+    def as_context(self) -> dict:
+        return asdict(self)
+
+    def with_metadata(self, metadata: Optional[str]) -> "InterviewEnv":
+        """Override fields with the JSON metadata the backend attaches to the job dispatch"""
+        if not metadata:
+            return self
+        try:
+            values = json.loads(metadata)
+        except ValueError:
+            print(f"Ignoring invalid job metadata: {metadata!r}")
+            return self
+        fields = {key: values[key] for key in asdict(self) if values.get(key) is not None}
+        if "duration_minutes" in fields:
+            try:
+                fields["duration_minutes"] = float(fields["duration_minutes"])
+            except (TypeError, ValueError):
+                del fields["duration_minutes"]
+        return replace(self, **fields)
+
+
+def _env_text(name: str) -> Optional[str]:
+    value = os.getenv(name)
+    return value if value and value != "None" else None
+
+
+@lru_cache(maxsize=1)
+def load_interview_env() -> InterviewEnv:
+    """Read the INTERVIEW_* variables once per worker process"""
+    duration = _env_text("INTERVIEW_DURATION")
+    try:
+        duration_minutes = float(duration) if duration else None
+    except ValueError:
+        print(f"Ignoring invalid INTERVIEW_DURATION={duration!r}")
+        duration_minutes = None
+    return InterviewEnv(
+        technology=_env_text("INTERVIEW_TECHNOLOGY"),
+        company=_env_text("INTERVIEW_COMPANY"),
+        experience_level=_env_text("INTERVIEW_EXPERIENCE"),
+        duration_minutes=duration_minutes,
+    )
+
+
+# Identical for every session so the provider can reuse its cached prompt prefix;
+# per-user details go in a separate system message after it
+STATIC_PROMPT = (
+    "You are a expert interviewer who simulates a real interview environment hence helping users prepare for a Job interview. "
+    "Based on the interview context you are given, ask questions related to the interview and get the answers. Once the user answers a question ask one "
+    "followup question if it makes sense in the conversation, else proceed to ask the next question. "
+)
+
+# Per-user details, always rendered in the same shape; missing values get fixed defaults
+CONTEXT_TEMPLATE = Template(
+    "Interview context: the user is preparing for $tech interview at $company with experience level $experience."
+)
+
 
 class Assistant(Agent):
     def __init__(self, user_context: dict = None) -> None:
         self.user_context = user_context or {}
-        instructions = "You are a expert interviewer who simulates a real interview environment hence helping users prepare for a Job interview."
-        if self.user_context:
-            tech = self.user_context.get("technology")
-            company = self.user_context.get("company")
-            experience = self.user_context.get("experience_level")
-            if tech or company or experience:
-                instructions += (
-                f"The user is preparing for {tech or ''} interview at {company or ''} with experience level {experience or ''}." \
-                "Based on this information ask questions related to the interview and get the answers. Once the user answers a question ask one " \
-                "followup question if it makes sense in the conversation, else proceed to ask the next question. "
-                )
-        super().__init__(instructions=instructions)
+        # A system message, not a user turn; the agent inserts STATIC_PROMPT ahead of it as the first message
+        chat_ctx = ChatContext.empty()
+        chat_ctx.add_message(
+            role="system",
+            content=CONTEXT_TEMPLATE.substitute(
+                tech=self.user_context.get("technology") or "a technical",
+                company=self.user_context.get("company") or "a company",
+                experience=self.user_context.get("experience_level") or "unspecified",
+            ),
+        )
+        super().__init__(instructions=STATIC_PROMPT, chat_ctx=chat_ctx)
 
     async def on_enter(self):
-        self.start_time = time.monotonic()
-
-    async def on_user_message(self, message):
-        """
-        Called when the user sends a message/answer.
-        Checks if the interview duration has elapsed and ends the session if needed.
-        """
-        # Check if duration is set and time has elapsed
-        if self.duration_minutes and self.start_time:
-            elapsed = (time.monotonic() - self.start_time) / 60
-            if elapsed >= self.duration_minutes:
-                await self.session.send_reply(
-                    "Thank you for your answer. The interview duration has ended. If you have any questions, feel free to ask!"
-                )
-                await self.session.end()
-                return
+        # End the interview once its duration is up instead of checking the clock on every turn
+        self._deadline_handle = None
+        duration_minutes = self.user_context.get("duration_minutes")
+        if duration_minutes and duration_minutes > 0:
+            self._deadline_handle = asyncio.get_running_loop().call_later(
+                duration_minutes * 60, self._on_deadline
+            )
+
+    async def on_exit(self):
+        handle = getattr(self, "_deadline_handle", None)
+        if handle is not None:
+            handle.cancel()
+            self._deadline_handle = None
+
+    def _on_deadline(self):
+        self._deadline_handle = None
+        self._end_task = asyncio.create_task(self._finalize_and_end())
+
+    async def _finalize_and_end(self):
+        """Tell the user the time is up and close the session"""
+        await self.session.say(
+            "Thank you for your answer. The interview duration has ended. If you have any questions, feel free to ask!"
+        )
+        await self.session.aclose()
+
+
+# OpenAI-compatible endpoints; pick the provider closest to the worker's region for the lowest TTFT
+LLM_PROVIDERS = {
+    "openai": (None, "OPENAI_API_KEY"),
+    "groq": ("https://api.groq.com/openai/v1", "GROQ_API_KEY"),
+    "cerebras": ("https://api.cerebras.ai/v1", "CEREBRAS_API_KEY"),
+}
+
+
+def build_llm() -> OpenAILLM:
+    """Build the interview LLM from INTERVIEW_LLM_PROVIDER / INTERVIEW_LLM_MODEL (LLM_BASE_URL overrides the endpoint)"""
+    provider = os.getenv("INTERVIEW_LLM_PROVIDER", "openai").lower()
+    default_base_url, api_key_env = LLM_PROVIDERS.get(provider, LLM_PROVIDERS["openai"])
+
+    options = {"model": os.getenv("INTERVIEW_LLM_MODEL", "gpt-4o-mini")}
+    base_url = os.getenv("LLM_BASE_URL") or default_base_url
+    if base_url:
+        options["base_url"] = base_url
+    api_key = os.getenv("LLM_API_KEY") or os.getenv(api_key_env)
+    if api_key:
+        options["api_key"] = api_key
+    return OpenAILLM(**options)
+
+
+@lru_cache(maxsize=4)
+def _plugin_clients(loop_id: int) -> dict:
+    """STT/LLM/TTS plugins for one event loop; their HTTP sessions are loop-bound"""
+    # One keep-alive pool for the Gladia and Cartesia requests/websockets. It is owned
+    # here rather than taken from the job's http_session(), which closes when a job ends
+    http_session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=64, keepalive_timeout=120, ttl_dns_cache=300)
+    )
+    return {
+        # Interim results feed preemptive generation
+        "stt": GladiaSTT(interim_results=True, http_session=http_session),
+        "llm": build_llm(),
+        # Raw PCM at the room output rate (24 kHz) streams straight through without resampling
+        "tts": CartesiaTTS(
+            model="sonic-2",
+            voice="f786b574-daa5-4673-aa0c-cbe3e8534c02",
+            encoding="pcm_s16le",
+            sample_rate=24000,
+            http_session=http_session,
+        ),
+    }
+
+
+def get_plugin_clients() -> dict:
+    """Reuse plugin clients (and their warm connection pools) across sessions on the running loop"""
+    return _plugin_clients(id(asyncio.get_running_loop()))
+
+
+def load_vad() -> SileroVAD:
+    """Load Silero VAD, swapping in the model at SILERO_VAD_MODEL_PATH (e.g. an INT8 build) when set"""
+    vad = SileroVAD.load()
+    model_path = os.getenv("SILERO_VAD_MODEL_PATH")
+    if not model_path:
+        return vad
+
+    try:
+        import onnxruntime
+
+        # Same session settings the plugin uses for its bundled model
+        opts = onnxruntime.SessionOptions()
+        opts.add_session_config_entry("session.intra_op.allow_spinning", "0")
+        opts.add_session_config_entry("session.inter_op.allow_spinning", "0")
+        opts.inter_op_num_threads = 1
+        opts.intra_op_num_threads = 1
+        opts.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        vad._onnx_session = onnxruntime.InferenceSession(
+            model_path, providers=["CPUExecutionProvider"], sess_options=opts
+        )
+    except Exception as error:
+        print(f"Could not load VAD model from {model_path}, using the bundled model: {error}")
+    return vad
+
+
+def warm_vad(vad: SileroVAD) -> None:
+    """Run one window of silence through the VAD session so ONNX Runtime finishes its lazy setup"""
+    try:
+        from livekit.plugins.silero import onnx_model
+
+        model = onnx_model.OnnxModel(onnx_session=vad._onnx_session, sample_rate=16000)
+        model(np.zeros(model.window_size_samples, dtype=np.float32))
+    except Exception as error:
+        print(f"VAD warm-up skipped: {error}")
+
+
+async def warm_turn_detector(turn_detection: MultilingualModel) -> None:
+    """Send a dummy turn to the inference process so the first real end-of-turn check is warm"""
+    chat_ctx = ChatContext.empty()
+    chat_ctx.add_message(role="assistant", content="Tell me about yourself.")
+    chat_ctx.add_message(role="user", content="Sure, I have been working as a developer")
+    try:
+        await turn_detection.predict_end_of_turn(chat_ctx)
+    except Exception as error:
+        print(f"Turn detector warm-up skipped: {error}")
 
 
 def prewarm(proc: JobProcess):
-    # Preload VAD model once per process
-    proc.userdata["vad"] = SileroVAD.load()
+    # Preload VAD model once per process and pay its first-inference cost here
+    vad = load_vad()
+    warm_vad(vad)
+    proc.userdata["vad"] = vad
+
+
+def build_session(ctx: agents.JobContext) -> AgentSession:
+    """Assemble the voice pipeline for one job from the shared plugin clients"""
+    clients = get_plugin_clients()
+    return AgentSession(
+        stt=clients["stt"],
+        llm=clients["llm"],
+        tts=clients["tts"],
+        vad=ctx.proc.userdata.get("vad") or load_vad(),
+        turn_detection=MultilingualModel(),
+        **SESSION_OPTIONS,
+    )
 
 
 async def entrypoint(ctx: agents.JobContext):
-    user_context = {
-        "technology": os.getenv("INTERVIEW_TECHNOLOGY"),
-        "company": os.getenv("INTERVIEW_COMPANY"),
-        "experience_level": os.getenv("INTERVIEW_EXPERIENCE"),
-    }
+    user_context = load_interview_env().with_metadata(ctx.job.metadata).as_context()
 
     # Build room input options
     room_input_options = RoomInputOptions()
     if BVC:
         room_input_options.noise_cancellation = BVC()
 
-    session = AgentSession(
-        stt=GladiaSTT(),
-        llm=OpenAILLM(model="gpt-4o-mini"),
-        tts=CartesiaTTS(model="sonic-2", voice="f786b574-daa5-4673-aa0c-cbe3e8534c02"),
-        vad=ctx.proc.userdata.get("vad") or SileroVAD.load(),
-        turn_detection=MultilingualModel(),
-    )
+    session = build_session(ctx)
+    # Warms up while the greeting is generated and spoken
+    warmup = asyncio.create_task(warm_turn_detector(session.turn_detection))
 
     await session.start(
         room=ctx.room,
@@ -118,12 +315,20 @@ async def entrypoint(ctx: agents.JobContext):
     await ctx.connect()
 
     await session.generate_reply("Greet the user and offer your assistance.")
+    await warmup
 
 
 if __name__ == "__main__":
+    missing = [MISSING_PLUGINS[name] for name in REQUIRED_PLUGINS if name in MISSING_PLUGINS]
+    if missing:
+        print(f"Cannot start the voice agent without: {', '.join(missing)}")
+        sys.exit(1)
+
     agents.cli.run_app(
         WorkerOptions(
             entrypoint_fnc=entrypoint,
             prewarm_fnc=prewarm,
+            # Explicit dispatch: the backend sends each interview room to this worker by name
+            agent_name=os.getenv("LIVEKIT_AGENT_NAME", "ai-interviewer"),
         )
     )
@@ -3,30 +3,42 @@ Main FastAPI application for AI Interview Platform with Pydantic AI
 """
 import os
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union, get_args
+import hashlib
 import re
 import subprocess
 import sys  # Add this import at the top with other imports
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel, Field
+from pydantic.alias_generators import to_camel
 from dotenv import load_dotenv
 from loguru import logger
+import msgspec
+import orjson
 
-from agents.orchestrator import AgenticOrchestrator
+from agents.orchestrator import AgenticOrchestrator, is_fallback_question
 from agents.performance_orchestrator import PerformanceAnalysisOrchestrator
 from services.livekit_service import LiveKitService
 from services.voice_interview_service import VoiceInterviewService
+from services.llm_cache import get_llm_cache
+from services.http_client import aclose_http_client
+from agents.response_analysis_agent import FALLBACK_REASONING
+from agents.analysis_cache import get_analysis_cache
 from models.interview_models import (
     InterviewConfig,
     QuestionGenerationRequest,
     FollowUpRequest,
     ResponseAnalysisRequest,
+    BatchResponseAnalysisRequest,
     AnalyticsRequest,
-    VoiceInterviewStartRequest
+    VoiceInterviewStartRequest,
+    VoiceInterviewStartRequestMsg,
+    VoiceInterviewEndRequest
 )
 
 # Load environment variables
@@ -41,16 +53,79 @@ performance_orchestrator: Optional[PerformanceAnalysisOrchestrator] = None
 livekit_service: Optional[LiveKitService] = None
 voice_service: Optional[VoiceInterviewService] = None
 
-# Store references to agent subprocesses by room or session if needed
-agent_processes: Dict[str, subprocess.Popen] = {}
+# Default executor for run_in_executor(None, ...) / asyncio.to_thread calls that wrap blocking work
+blocking_pool: Optional[ThreadPoolExecutor] = None
+
+# Follow-up requests whose answer is at least this similar to a cached one (same question
+# and config) reuse its follow-up
+SIMILAR_RESPONSE_THRESHOLD = float(os.getenv("SIMILAR_RESPONSE_THRESHOLD", "0.92"))
+
+# Analyses one /api/analyze-responses request may have in flight at once
+BATCH_ANALYSIS_CONCURRENCY = int(os.getenv("BATCH_ANALYSIS_CONCURRENCY", "8"))
+
+# One long-lived LiveKit agent worker; interviews are dispatched to it by agent name
+AGENT_NAME = os.getenv("LIVEKIT_AGENT_NAME", "ai-interviewer")
+AGENT_SCRIPT = os.path.join(os.path.dirname(__file__), "livekit_voice_agent.py")
+agent_worker: Optional[Union[asyncio.subprocess.Process, subprocess.Popen]] = None
+# Set by gunicorn.conf.py, whose master process runs the agent worker for all app workers
+AGENT_WORKER_EXTERNAL = os.getenv("AGENT_WORKER_EXTERNAL") == "1"
+
+# Health probes report 503 once this many tasks are pending on the event loop, so the
+# load balancer stops routing to a saturated worker
+MAX_PENDING_TASKS = int(os.getenv("MAX_PENDING_TASKS", "1000"))
+
+# Probe bodies that never change, serialized once
+HEALTH_BODY = b'{"status":"ok"}'
+OVERLOADED_BODY = b'{"status":"overloaded"}'
+system_info_body: Optional[bytes] = None
+system_info_etag: Optional[str] = None
+
+async def start_agent_worker() -> Union[asyncio.subprocess.Process, subprocess.Popen]:
+    """Launch the agent worker process"""
+    try:
+        return await asyncio.create_subprocess_exec(
+            sys.executable, AGENT_SCRIPT, "start",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            close_fds=True
+        )
+    except NotImplementedError:
+        # Selector loops on Windows (used by uvicorn's reloader) have no subprocess support
+        return subprocess.Popen(
+            [sys.executable, AGENT_SCRIPT, "start"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=True
+        )
+
+async def stop_agent_worker(proc: Union[asyncio.subprocess.Process, subprocess.Popen], timeout: float = 10) -> None:
+    """Terminate the agent worker without blocking the event loop"""
+    if isinstance(proc, asyncio.subprocess.Process):
+        if proc.returncode is not None:
+            return
+        wait = proc.wait()
+    else:
+        if proc.poll() is not None:
+            return
+        wait = asyncio.to_thread(proc.wait)
+    proc.terminate()
+    try:
+        await asyncio.wait_for(wait, timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning("LiveKit agent worker did not exit in time; killing it")
+        proc.kill()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
-    global orchestrator, performance_orchestrator, livekit_service, voice_service
+    global orchestrator, performance_orchestrator, livekit_service, voice_service, agent_worker, blocking_pool
+    global system_info_body, system_info_etag
     
     logger.info("🚀 Starting AI Interview Platform with Pydantic AI")
     
+    blocking_pool = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 5), thread_name_prefix="blocking")
+    asyncio.get_running_loop().set_default_executor(blocking_pool)
+    
     # Initialize services
     try:
         orchestrator = AgenticOrchestrator()
@@ -58,6 +133,18 @@ async def lifespan(app: FastAPI):
         livekit_service = LiveKitService()
         voice_service = VoiceInterviewService(livekit_service)
         
+        # Opened here so its database setup is queued before the first analysis request
+        get_analysis_cache()
+        
+        # Start the agent worker once so interviews only pay for a dispatch call
+        if livekit_service.is_configured() and not AGENT_WORKER_EXTERNAL:
+            agent_worker = await start_agent_worker()
+            logger.info(f"🎙️ LiveKit agent worker started (pid {agent_worker.pid})")
+        
+        # System info only changes at process start
+        system_info_body = orjson.dumps(build_system_info())
+        system_info_etag = f'"{hashlib.sha1(system_info_body).hexdigest()}"'
+        
         logger.info("✅ All services initialized successfully")
         
     except Exception as e:
@@ -68,13 +155,21 @@ async def lifespan(app: FastAPI):
     
     # Cleanup
     logger.info("🛑 Shutting down AI Interview Platform")
+    if agent_worker is not None:
+        await stop_agent_worker(agent_worker)
+    if livekit_service:
+        await livekit_service.aclose()
+    await aclose_http_client()
+    await get_analysis_cache().flush()
+    blocking_pool.shutdown(wait=False, cancel_futures=True)
 
 # Create FastAPI app
 app = FastAPI(
     title="AI Interview Practice Platform",
     description="Pydantic AI-powered interview practice with LiveKit voice integration",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -93,9 +188,11 @@ app.add_middleware(
 
 # Health check endpoint
 @app.get("/api/health")
-def health_check():
+async def health_check():
     """Health check endpoint"""
-    return {"status": "ok"}
+    if len(asyncio.all_tasks()) > MAX_PENDING_TASKS:
+        return Response(content=OVERLOADED_BODY, status_code=503, media_type="application/json")
+    return Response(content=HEALTH_BODY, media_type="application/json")
 
 # Question generation endpoint
 @app.post("/api/generate-question")
@@ -107,11 +204,16 @@ async def generate_question(request: QuestionGenerationRequest):
         
         logger.info(f"🤖 Generating question for topic: {request.config.topic}")
         
-        question = await orchestrator.generate_question(
-            config=request.config,
-            previous_questions=request.previous_questions or [],
-            previous_responses=request.previous_responses or [],
-            question_number=request.question_number or 1
+        question = await get_llm_cache().get_or_compute(
+            "generate_question",
+            request.model_dump(),
+            lambda: orchestrator.generate_question(
+                config=request.config,
+                previous_questions=request.previous_questions or [],
+                previous_responses=request.previous_responses or [],
+                question_number=request.question_number or 1
+            ),
+            cacheable=lambda result: not is_fallback_question(result, request.config.topic)
         )
         
         return {"question": question}
@@ -128,10 +230,18 @@ async def generate_followup(request: FollowUpRequest):
         if not orchestrator:
             raise HTTPException(status_code=503, detail="Orchestrator not initialized")
         
-        followup = await orchestrator.generate_followup(
-            original_question=request.question,
-            user_response=request.response,
-            config=request.config
+        followup = await get_llm_cache().get_or_compute(
+            "generate_followup",
+            request.model_dump(),
+            lambda: orchestrator.generate_followup(
+                original_question=request.question,
+                user_response=request.response,
+                config=request.config
+            ),
+            similar_field="response",
+            threshold=SIMILAR_RESPONSE_THRESHOLD,
+            # Timeouts and errors return FOLLOWUP_PLACEHOLDER, which must not be reused
+            cacheable=lambda result: not is_fallback_question(result, request.config.topic)
         )
         
         return {"followUp": followup}
@@ -148,11 +258,7 @@ async def analyze_response(request: ResponseAnalysisRequest):
         if not performance_orchestrator:
             raise HTTPException(status_code=503, detail="Performance orchestrator not initialized")
         
-        analysis = await performance_orchestrator.analyze_single_response(
-            question=request.question,
-            response=request.response,
-            config=request.config
-        )
+        analysis = await cached_response_analysis(request.question, request.response, request.config)
         
         return {"analysis": analysis}
         
@@ -160,6 +266,52 @@ async def analyze_response(request: ResponseAnalysisRequest):
         logger.error(f"❌ Error analyzing response: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/analyze-responses")
+async def analyze_responses(request: BatchResponseAnalysisRequest):
+    """Analyze several interview responses concurrently, returning analyses in request order"""
+    try:
+        if not performance_orchestrator:
+            raise HTTPException(status_code=503, detail="Performance orchestrator not initialized")
+        
+        logger.info(f"📝 Analyzing {len(request.pairs)} responses")
+        semaphore = asyncio.Semaphore(BATCH_ANALYSIS_CONCURRENCY)
+        
+        async def analyze(question: str, response: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await cached_response_analysis(question, response, request.config)
+        
+        results = await asyncio.gather(
+            *(analyze(pair.question, pair.response) for pair in request.pairs),
+            return_exceptions=True
+        )
+        
+        analyses = []
+        for pair, result in zip(request.pairs, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Error analyzing response in batch: {result}")
+                result = performance_orchestrator.generate_fallback_response_analysis(pair.response, request.config)
+            analyses.append(result)
+        
+        return {"analyses": analyses}
+        
+    except Exception as e:
+        logger.error(f"❌ Error analyzing responses: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def cached_response_analysis(question: str, response: str, config: InterviewConfig) -> Dict[str, Any]:
+    """Analyze one response through the endpoint cache, shared by the single and batch endpoints"""
+    # Exact matches only: a slightly different answer can deserve a different score
+    return await get_llm_cache().get_or_compute(
+        "analyze_response",
+        {"question": question, "response": response, "config": config.dumped},
+        lambda: performance_orchestrator.analyze_single_response(
+            question=question,
+            response=response,
+            config=config
+        ),
+        cacheable=lambda result: result.get("reasoning") != FALLBACK_REASONING
+    )
+
 # Analytics generation endpoint
 @app.post("/api/generate-analytics")
 async def generate_analytics(request: AnalyticsRequest):
@@ -170,9 +322,17 @@ async def generate_analytics(request: AnalyticsRequest):
         
         logger.info(f"📊 Generating analytics for {len(request.responses)} responses")
         
-        analytics = await performance_orchestrator.generate_comprehensive_analytics(
-            responses=request.responses,
-            config=request.config
+        analytics = await get_llm_cache().get_or_compute(
+            "generate_analytics",
+            request.model_dump(),
+            lambda: performance_orchestrator.generate_comprehensive_analytics(
+                responses=request.responses,
+                config=request.config
+            ),
+            cacheable=lambda result: (
+                result.metadata.get("analysis_method") != "fallback"
+                and not result.metadata.get("fallback_responses")
+            )
         )
         
         return {"analytics": analytics}
@@ -182,15 +342,24 @@ async def generate_analytics(request: AnalyticsRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 # Voice interview endpoints
+# The start payload is decoded and validated by msgspec instead of pydantic
+_voice_start_decoder = msgspec.json.Decoder(VoiceInterviewStartRequestMsg)
+
 @app.post("/api/voice-interview/start")
-async def start_voice_interview(request: VoiceInterviewStartRequest):
+async def start_voice_interview(raw_request: Request):
     """Start voice interview session"""
+    try:
+        request = _voice_start_decoder.decode(await raw_request.body())
+    except msgspec.DecodeError as error:
+        # ValidationError is a DecodeError subclass
+        raise HTTPException(status_code=422, detail=str(error))
+    
     try:
         if not voice_service:
             raise HTTPException(status_code=503, detail="Voice service not initialized")
         
         logger.info(f"🎙️ Starting voice interview for: {request.participant_name}")
-        logger.debug(f"VoiceInterviewStartRequest: {request.model_dump()}")
+        logger.opt(lazy=True).debug("VoiceInterviewStartRequest: {}", lambda: msgspec.to_builtins(request))
 
         # Validate required fields for identity and room
         if not hasattr(request, "participant_name") or not request.participant_name:
@@ -207,39 +376,25 @@ async def start_voice_interview(request: VoiceInterviewStartRequest):
             agent_provider=request.agent_provider
         )
 
-        # --- Start the LiveKit Voice Agent as a subprocess ---
+        # --- Dispatch the LiveKit Voice Agent worker to the interview room ---
         room_name = session.get("room_name")
-        agent_token = session.get("interviewer_token") or session.get("participant_token")
-        agent_script = os.path.join(os.path.dirname(__file__), "livekit_voice_agent.py")
-        if room_name and agent_token:
-            # Extract user context from the interview config
+        if room_name:
             interview_config = request.config
-            env = os.environ.copy()
-            env["LIVEKIT_ROOM_NAME"] = room_name
-            env["LIVEKIT_AGENT_TOKEN"] = agent_token
-            # Pass user context as environment variables
-            env["INTERVIEW_TECHNOLOGY"] = getattr(interview_config, "topic", "")
-            env["INTERVIEW_COMPANY"] = getattr(interview_config, "company_name", "")
-            env["INTERVIEW_EXPERIENCE"] = getattr(interview_config, "experience_level", "")
-            env["INTERVIEW_DURATION"] = str(getattr(interview_config, "duration"))
-            logger.info(f"LiveKit ENV for agent: LIVEKIT_WS_URL={env.get('LIVEKIT_WS_URL')}, LIVEKIT_ROOM_NAME={env.get('LIVEKIT_ROOM_NAME')}, INTERVIEW_TECHNOLOGY={env.get('INTERVIEW_TECHNOLOGY')}, INTERVIEW_COMPANY={env.get('INTERVIEW_COMPANY')}, INTERVIEW_EXPERIENCE={env.get('INTERVIEW_EXPERIENCE')}")
-
-            proc = subprocess.Popen(
-                [sys.executable, agent_script, "start"],
-                env=env,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                close_fds=True
+            await livekit_service.dispatch_agent(
+                room_name,
+                AGENT_NAME,
+                metadata={
+                    "technology": interview_config.topic,
+                    "company": interview_config.company_name,
+                    "experience_level": interview_config.experience_level,
+                    "duration_minutes": interview_config.duration
+                }
             )
-            # Store the process by room/session for later termination
-            agent_processes[room_name] = proc
+            voice_service.update_session(room_name, status="active")
         else:
-            logger.error(f"Could not launch LiveKit Voice Agent: room_name or agent_token missing in session response. room_name={room_name}, agent_token={'present' if agent_token else 'missing'}")
+            logger.error("Could not dispatch LiveKit Voice Agent: room_name missing in session response")
 
-        # DEBUG: Print the session response to the console
-        print("=== Outgoing session response ===")
-        print(session)
-        print("=================================")
+        logger.debug("Outgoing session response: {}", session)
 
         return session
         
@@ -249,27 +404,28 @@ async def start_voice_interview(request: VoiceInterviewStartRequest):
         
 
 
+@app.get("/api/voice-interview/{session_id}/status")
+async def get_voice_interview_status(session_id: str):
+    """Get voice interview session status"""
+    if not voice_service:
+        raise HTTPException(status_code=503, detail="Voice service not initialized")
+    return Response(content=voice_service.get_session_status_json(session_id), media_type="application/json")
+
 @app.post("/api/voice-interview/end")
-async def end_voice_interview(request: VoiceInterviewStartRequest):
+async def end_voice_interview(request: VoiceInterviewEndRequest):
     """
-    End the voice interview session and terminate the LiveKit agent.
+    End the voice interview session.
     """
     try:
-        room_name = getattr(request.config, "room_name", None) or getattr(request, "room_name", None)
-        if not room_name:
-            raise HTTPException(status_code=400, detail="room_name is required to end the agent session")
-        proc = agent_processes.get(room_name)
-        if proc:
-            proc.terminate()
-            proc.wait(timeout=5)
-            del agent_processes[room_name]
-            logger.info(f"✅ Terminated agent process for room: {room_name}")
-        else:
-            logger.warning(f"No agent process found for room: {room_name}")
-        # Optionally, also call any cleanup on your VoiceInterviewService
+        room_name = request.room_name
+        # Deleting the room disconnects the dispatched agent, which ends its job
+        if livekit_service and livekit_service.is_configured():
+            await livekit_service.delete_room(room_name)
         if voice_service:
-            await voice_service.end_voice_interview(request)
-        return JSONResponse({"status": "ended"}, status_code=status.HTTP_200_OK)
+            voice_service.end_session(room_name)
+        return ORJSONResponse({"status": "ended"})
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error ending voice interview: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -294,9 +450,8 @@ async def get_livekit_config():
         return {"configured": False, "error": str(e)}
 
 # System info endpoint
-@app.get("/api/system/info")
-async def get_system_info():
-    """Get system information"""
+def build_system_info() -> Dict[str, Any]:
+    """Collect the system information reported by /api/system/info"""
     return {
         "application": {
             "name": "AI Interview Practice Platform",
@@ -316,35 +471,139 @@ async def get_system_info():
         }
     }
 
+@app.get("/api/system/info")
+async def get_system_info(request: Request):
+    """Get system information"""
+    if system_info_body is None:
+        return build_system_info()
+    if request.headers.get("if-none-match") == system_info_etag:
+        return Response(status_code=304, headers={"ETag": system_info_etag})
+    return Response(content=system_info_body, media_type="application/json", headers={"ETag": system_info_etag})
+
 # Middleware to convert camelCase to snake_case
+_split_capitalized_word = re.compile('(.)([A-Z][a-z]+)').sub
+_split_lower_upper = re.compile('([a-z0-9])([A-Z])').sub
+
+def _regex_camel_to_snake(name: str) -> str:
+    return _split_lower_upper(r'\1_\2', _split_capitalized_word(r'\1_\2', name)).lower()
+
+def _request_field_names(model: type, seen: set) -> set:
+    """Field names of a request model and of the models nested in its fields"""
+    if model in seen:
+        return set()
+    seen.add(model)
+    names = set(model.model_fields)
+    pending = [field.annotation for field in model.model_fields.values()]
+    while pending:
+        annotation = pending.pop()
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            names |= _request_field_names(annotation, seen)
+        pending.extend(get_args(annotation))
+    return names
+
+def _known_key_map() -> Dict[str, str]:
+    """camelCase and snake_case spellings of every request model field, mapped to snake_case"""
+    key_map = {}
+    seen = set()
+    for model in (
+        QuestionGenerationRequest,
+        FollowUpRequest,
+        ResponseAnalysisRequest,
+        BatchResponseAnalysisRequest,
+        AnalyticsRequest,
+        VoiceInterviewStartRequest
+    ):
+        for name in _request_field_names(model, seen):
+            key_map[name] = name
+            camel = to_camel(name)
+            # Only keep spellings the regex conversion maps back to the field name
+            if _regex_camel_to_snake(camel) == name:
+                key_map[camel] = name
+    return key_map
+
+# Precomputed conversions for the keys clients send; other keys are converted once and
+# remembered, up to _MAX_SNAKE_KEYS entries so arbitrary client keys cannot grow it unbounded
+_snake_keys: Dict[str, str] = _known_key_map()
+_MAX_SNAKE_KEYS = 4096
+
 def camel_to_snake(name: str) -> str:
     """Convert camelCase or PascalCase to snake_case."""
-    s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
-    return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
+    snake = _snake_keys.get(name)
+    if snake is None:
+        snake = _regex_camel_to_snake(name)
+        if len(_snake_keys) < _MAX_SNAKE_KEYS:
+            _snake_keys[name] = snake
+    return snake
+
+def snake_case_keys(data: Any) -> bool:
+    """Rename dict keys to snake_case throughout freshly parsed JSON, in place and without recursion.
+    
+    Returns whether any key was renamed, so unchanged bodies need not be re-serialized.
+    """
+    renamed = False
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            # Dicts whose keys are already snake_case are left as they are
+            if any(camel_to_snake(key) != key for key in obj):
+                renamed = True
+                items = list(obj.items())
+                obj.clear()
+                for key, value in items:
+                    obj[camel_to_snake(key)] = value
+            stack.extend(value for value in obj.values() if isinstance(value, (dict, list)))
+        elif isinstance(obj, list):
+            stack.extend(item for item in obj if isinstance(item, (dict, list)))
+    return renamed
+
+# Requests that never carry a JSON body to rewrite
+_BODYLESS_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "DELETE"})
+_PASSTHROUGH_PATH_PREFIXES = ("/api/health", "/api/system", "/api/livekit/config")
 
 @app.middleware("request")
 async def camelcase_to_snakecase_middleware(request: Request, call_next):
+    # Decide from the method, path and headers alone so these requests are never buffered
+    if (
+        request.method in _BODYLESS_METHODS
+        or request.url.path.startswith(_PASSTHROUGH_PATH_PREFIXES)
+        or request.headers.get("content-length") == "0"
+    ):
+        return await call_next(request)
+    
     if request.headers.get("content-type", "").startswith("application/json"):
         body = await request.body()
         if body:
-            import json
             try:
-                data = json.loads(body)
-                def convert_keys(obj):
-                    if isinstance(obj, dict):
-                        return {camel_to_snake(k): convert_keys(v) for k, v in obj.items()}
-                    elif isinstance(obj, list):
-                        return [convert_keys(i) for i in obj]
-                    else:
-                        return obj
-                snake_data = convert_keys(data)
-                # Replace the request._body attribute (FastAPI/Starlette internal)
-                request._body = json.dumps(snake_data).encode("utf-8")
+                data = orjson.loads(body)
+                # Replace the request._body attribute (FastAPI/Starlette internal) only when keys changed
+                if snake_case_keys(data):
+                    request._body = orjson.dumps(data)
             except Exception:
                 pass
     response = await call_next(request)
     return response
 
+# Opt-in request profiling: with ENABLE_PROFILING set, add ?profile=1 to a request to get
+# a pyinstrument report instead of its response. Nothing is registered otherwise.
+if os.getenv("ENABLE_PROFILING"):
+    try:
+        from pyinstrument import Profiler
+        from fastapi.responses import HTMLResponse
+    except ImportError:
+        logger.warning("ENABLE_PROFILING is set but pyinstrument is not installed; profiling disabled")
+    else:
+        # Registered last so it wraps, and measures, the camelCase middleware too
+        @app.middleware("http")
+        async def profile_request(request: Request, call_next):
+            if not request.query_params.get("profile"):
+                return await call_next(request)
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+            await call_next(request)
+            profiler.stop()
+            return HTMLResponse(profiler.output_html())
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -353,6 +612,9 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=port,
-        reload=True,
+        reload=os.getenv("ENVIRONMENT") == "development",
+        # uvloop and the C httptools parser; uvloop does not support Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level="info"
     )
\ No newline at end of file
@@ -2,25 +2,95 @@
 Authentication middleware for Python backend
 """
 import os
-import jwt
-from typing import Optional, Dict, Any
+import base64
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 from fastapi import HTTPException, Request, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from supabase import create_client, Client
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
 from loguru import logger
+import orjson
 
 from models.user_models import AuthenticatedUser, UserProfile
+from services.http_client import get_http_client
 
-# Initialize Supabase client
+# Supabase configuration
 supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")  # Use service role for backend
 
-if supabase_url and supabase_key:
-    supabase: Client = create_client(supabase_url, supabase_key)
-else:
-    supabase = None
+if not (supabase_url and supabase_key):
     logger.warning("Supabase not configured - authentication will be disabled")
 
+# Async client on the shared HTTP pool, created on first use
+_supabase: Optional[AsyncClient] = None
+
+async def get_supabase() -> Optional[AsyncClient]:
+    """Get the Supabase client, or None when Supabase is not configured"""
+    global _supabase
+    if _supabase is None and supabase_url and supabase_key:
+        _supabase = await acreate_client(
+            supabase_url,
+            supabase_key,
+            options=AsyncClientOptions(httpx_client=get_http_client())
+        )
+    return _supabase
+
+# Only the profile columns UserProfile reads
+PROFILE_COLUMNS = ",".join(UserProfile.model_fields)
+
+# Resolved users keyed by token hash; entries live at most this long, and never past the token's expiry
+USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+USER_CACHE_MAX_ENTRIES = 10_000
+_user_cache: "OrderedDict[str, Tuple[float, AuthenticatedUser]]" = OrderedDict()
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def _get_cached_user(key: str) -> Optional[AuthenticatedUser]:
+    entry = _user_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, user = entry
+    if expires_at < time.time():
+        del _user_cache[key]
+        return None
+    _user_cache.move_to_end(key)
+    return user
+
+def _cache_user(key: str, user: AuthenticatedUser, token_expires_at: float) -> None:
+    _user_cache[key] = (min(time.time() + USER_CACHE_TTL_SECONDS, token_expires_at), user)
+    _user_cache.move_to_end(key)
+    while len(_user_cache) > USER_CACHE_MAX_ENTRIES:
+        _user_cache.popitem(last=False)
+
+def invalidate_token(token: str) -> None:
+    """Forget the cached user for a token, e.g. on logout"""
+    _user_cache.pop(_token_key(token), None)
+
+def decode_claims(token: str) -> Optional[Dict[str, Any]]:
+    """Read a JWT's claims without verifying its signature (Supabase handles that)
+    
+    Returns None for malformed or expired tokens and for tokens lacking sub, email or exp.
+    """
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    segment = parts[1]
+    try:
+        claims = orjson.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+    except ValueError:
+        return None
+    if not isinstance(claims, dict):
+        return None
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)) or exp <= time.time():
+        return None
+    if not claims.get("sub") or not claims.get("email"):
+        return None
+    return claims
+
 security = HTTPBearer(auto_error=False)
 
 class AuthMiddleware:
@@ -31,37 +101,43 @@ class AuthMiddleware:
         credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
     ) -> Optional[AuthenticatedUser]:
         """Get current authenticated user from JWT token"""
-        if not supabase or not credentials:
+        if not credentials:
             return None
         
         try:
+            supabase = await get_supabase()
+            if not supabase:
+                return None
+            
             # Verify JWT token with Supabase
             token = credentials.credentials
+            cache_key = _token_key(token)
+            cached_user = _get_cached_user(cache_key)
+            if cached_user is not None:
+                return cached_user
             
-            # Decode JWT to get user info
-            decoded_token = jwt.decode(
-                token, 
-                options={"verify_signature": False}  # Supabase handles signature verification
-            )
-            
-            user_id = decoded_token.get("sub")
-            email = decoded_token.get("email")
-            
-            if not user_id or not email:
+            # Decode JWT to get user info; expired tokens stop here, before any database call
+            decoded_token = decode_claims(token)
+            if decoded_token is None:
                 return None
             
+            user_id = decoded_token["sub"]
+            email = decoded_token["email"]
+            
             # Get user profile from database
-            profile_data = supabase.table("profiles").select("*").eq("id", user_id).single().execute()
+            profile_data = await supabase.table("profiles").select(PROFILE_COLUMNS).eq("id", user_id).single().execute()
             
             profile = None
             if profile_data.data:
                 profile = UserProfile(**profile_data.data)
             
-            return AuthenticatedUser(
+            user = AuthenticatedUser(
                 user_id=user_id,
                 email=email,
                 profile=profile
             )
+            _cache_user(cache_key, user, float(decoded_token["exp"]))
+            return user
             
         except Exception as error:
             logger.error(f"Authentication error: {error}")
@@ -10,6 +10,7 @@ from .interview_models import (
     ResponseAnalysisRequest,
     AnalyticsRequest,
     VoiceInterviewStartRequest,
+    VoiceInterviewEndRequest,
     ResponseAnalysis,
     QuestionMetadata,
     TopicAnalysis,
@@ -24,6 +25,7 @@ __all__ = [
     "ResponseAnalysisRequest",
     "AnalyticsRequest",
     "VoiceInterviewStartRequest",
+    "VoiceInterviewEndRequest",
     "ResponseAnalysis",
     "QuestionMetadata",
     "TopicAnalysis",
@@ -1,17 +1,37 @@
 """
 Pydantic models for interview system
 """
-from typing import List, Optional, Dict, Any, Literal
-from pydantic import BaseModel, Field
+from typing import Annotated, List, Optional, Dict, Any, Literal
+from functools import cached_property
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
+import msgspec
+
+InterviewStyle = Literal["technical", "hr", "behavioral", "salary-negotiation", "case-study"]
+ExperienceLevel = Literal["fresher", "junior", "mid-level", "senior", "lead-manager"]
+AgentProvider = Literal["openai", "google"]
 
 class InterviewConfig(BaseModel):
     """Interview configuration model"""
+    # Immutable after validation, so the cached dump below only needs resetting on model_copy
+    model_config = ConfigDict(frozen=True)
+    
     topic: str = Field(..., description="Interview topic")
-    style: Literal["technical", "hr", "behavioral", "salary-negotiation", "case-study"] = Field(..., description="Interview style")
-    experience_level: Literal["fresher", "junior", "mid-level", "senior", "lead-manager"] = Field(..., description="Experience level")
+    style: InterviewStyle = Field(..., description="Interview style")
+    experience_level: ExperienceLevel = Field(..., description="Experience level")
     company_name: Optional[str] = Field(None, description="Target company name")
     duration: int = Field(..., ge=15, le=120, description="Interview duration in minutes")
+    
+    @cached_property
+    def dumped(self) -> Dict[str, Any]:
+        """model_dump() computed once per config; shared, so treat it as read-only"""
+        return self.model_dump()
+    
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "InterviewConfig":
+        """Copy the config; the cached dump is dropped so a copy with updated fields re-dumps them"""
+        copied = super().model_copy(update=update, deep=deep)
+        copied.__dict__.pop("dumped", None)
+        return copied
 
 class InterviewResponse(BaseModel):
     """Interview response model"""
@@ -40,6 +60,16 @@ class ResponseAnalysisRequest(BaseModel):
     response: str = Field(..., description="User response")
     config: InterviewConfig
 
+class QuestionResponsePair(BaseModel):
+    """One question and the user's answer to it"""
+    question: str = Field(..., description="Interview question")
+    response: str = Field(..., description="User response")
+
+class BatchResponseAnalysisRequest(BaseModel):
+    """Request for analyzing several responses of one interview"""
+    pairs: List[QuestionResponsePair] = Field(..., min_length=1, max_length=100, description="Question/response pairs")
+    config: InterviewConfig
+
 class AnalyticsRequest(BaseModel):
     """Request for analytics generation"""
     responses: List[InterviewResponse] = Field(..., description="Interview responses")
@@ -50,10 +80,16 @@ class VoiceInterviewStartRequest(BaseModel):
     config: InterviewConfig
     participant_name: Optional[str] = Field(None, description="Participant name")
     enable_ai_agent: bool = Field(True, description="Enable AI agent")
-    agent_provider: Literal["openai", "google"] = Field("google", description="AI agent provider")
+    agent_provider: AgentProvider = Field("google", description="AI agent provider")
+
+class VoiceInterviewEndRequest(BaseModel):
+    """Request to end voice interview"""
+    room_name: str = Field(..., min_length=1, description="LiveKit room of the interview")
 
 class ResponseAnalysis(BaseModel):
     """Response analysis result"""
+    model_config = ConfigDict(revalidate_instances="never")
+    
     clarity: int = Field(..., ge=0, le=100, description="Clarity score")
     structure: int = Field(..., ge=0, le=100, description="Structure score")
     technical: int = Field(..., ge=0, le=100, description="Technical score")
@@ -72,6 +108,8 @@ class QuestionMetadata(BaseModel):
 
 class TopicAnalysis(BaseModel):
     """Topic analysis result"""
+    model_config = ConfigDict(revalidate_instances="never")
+    
     main_concepts: List[str] = Field(..., description="Main concepts")
     skills: List[str] = Field(..., description="Required skills")
     technologies: List[str] = Field(..., description="Relevant technologies")
@@ -82,6 +120,8 @@ class TopicAnalysis(BaseModel):
 
 class PerformanceAnalytics(BaseModel):
     """Performance analytics result"""
+    model_config = ConfigDict(revalidate_instances="never")
+    
     overall_score: int = Field(..., ge=0, le=100, description="Overall score")
     performance_level: Literal["excellent", "good", "fair", "needs_improvement"] = Field(..., description="Performance level")
     strengths: List[str] = Field(..., description="Identified strengths")
@@ -92,4 +132,19 @@ class PerformanceAnalytics(BaseModel):
     executive_summary: str = Field(..., description="Executive summary")
     next_steps: List[str] = Field(..., description="Next steps")
     question_reviews: List[Dict[str, Any]] = Field(..., description="Question-by-question reviews")
-    metadata: Dict[str, Any] = Field(..., description="Analysis metadata")
\ No newline at end of file
+    metadata: Dict[str, Any] = Field(..., description="Analysis metadata")
+
+class InterviewConfigMsg(msgspec.Struct, frozen=True, gc=False):
+    """InterviewConfig as a msgspec struct, for routes that decode their body with msgspec"""
+    topic: str
+    style: InterviewStyle
+    experience_level: ExperienceLevel
+    duration: Annotated[int, msgspec.Meta(ge=15, le=120)]
+    company_name: Optional[str] = None
+
+class VoiceInterviewStartRequestMsg(msgspec.Struct, frozen=True, gc=False):
+    """VoiceInterviewStartRequest as a msgspec struct"""
+    config: InterviewConfigMsg
+    participant_name: Optional[str] = None
+    enable_ai_agent: bool = True
+    agent_provider: AgentProvider = "google"
\ No newline at end of file
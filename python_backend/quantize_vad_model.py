@@ -0,0 +1,23 @@
+"""
+Build-time helper: write a dynamic-INT8 copy of the bundled Silero VAD model
+
+Usage: python quantize_vad_model.py [output_path]
+Then point SILERO_VAD_MODEL_PATH at the output so livekit_voice_agent loads it.
+Unset the variable to go back to the FP32 model if detection quality drops.
+"""
+import importlib.resources
+import sys
+
+from onnxruntime.quantization import QuantType, quantize_dynamic
+
+
+def main() -> None:
+    output_path = sys.argv[1] if len(sys.argv) > 1 else "silero_vad.int8.onnx"
+    resource = importlib.resources.files("livekit.plugins.silero.resources") / "silero_vad.onnx"
+    with importlib.resources.as_file(resource) as model_path:
+        quantize_dynamic(str(model_path), output_path, weight_type=QuantType.QInt8)
+    print(f"Wrote {output_path}")
+
+
+if __name__ == "__main__":
+    main()
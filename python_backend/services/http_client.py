@@ -0,0 +1,27 @@
+"""
+Process-wide pooled HTTP client for outbound REST calls
+"""
+from typing import Optional
+import httpx
+from loguru import logger
+
+_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared client, created on first use; connections are kept alive across requests"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+            timeout=httpx.Timeout(10.0)
+        )
+        logger.info("[HttpClient] Created shared HTTP client")
+    return _client
+
+async def aclose_http_client() -> None:
+    """Close the shared client if it was created"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -2,22 +2,64 @@
 LiveKit Service for Python backend
 """
 import os
-from typing import Optional, Dict, Any
-from livekit import api
+import asyncio
+import base64
+import hashlib
+import hmac
+import secrets
+import time
+from typing import TYPE_CHECKING, Optional, Dict, Any
 from loguru import logger
+import orjson
+
+if TYPE_CHECKING:
+    import aiohttp
+    from livekit import api
+
+# Lifetime of issued access tokens, matching livekit-api's AccessToken default
+TOKEN_TTL_SECONDS = 6 * 3600
+
+# Room and permissions granted to interview participants; only the room varies per token
+# (it is required for agent dispatch)
+_GRANTS_TEMPLATE = {
+    "roomJoin": True,
+    "room": "",
+    "canPublish": True,
+    "canSubscribe": True,
+    "canPublishData": True,
+    "canUpdateOwnMetadata": True
+}
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
 
 class LiveKitService:
     """LiveKit service for managing rooms and tokens"""
     
+    # Every token has the same HS256 header, so its encoding is computed once
+    _HEADER_B64 = _b64url(b'{"alg":"HS256","typ":"JWT"}')
+    
     def __init__(self):
         self.api_key = os.getenv("LIVEKIT_API_KEY")
         self.api_secret = os.getenv("LIVEKIT_API_SECRET")
         self.ws_url = os.getenv("LIVEKIT_WS_URL")
+        # Credentials are only read here, so validity and the HMAC key are computed once
+        self._configured = bool(self.api_key and self.api_secret and self.ws_url)
+        self._signing_key = self.api_secret.encode("utf-8") if self.api_secret else None
         
-        logger.info("[LiveKitService] Initializing LiveKit service")
-        logger.info(f"[LiveKitService] API Key: {'Set' if self.api_key else 'Not set'}")
-        logger.info(f"[LiveKitService] API Secret: {'Set' if self.api_secret else 'Not set'}")
-        logger.info(f"[LiveKitService] WS URL: {self.ws_url if self.ws_url else 'Not set'}")
+        # Server API client and its connection pool, created on first use and reused for every request
+        # (livekit-api and aiohttp are imported there, so processes without LiveKit never load them)
+        self._api: Optional["api.LiveKitAPI"] = None
+        self._http_session: Optional["aiohttp.ClientSession"] = None
+        
+        logger.info(
+            "[LiveKitService] Initializing LiveKit service: {}",
+            {
+                "api_key": "Set" if self.api_key else "Not set",
+                "api_secret": "Set" if self.api_secret else "Not set",
+                "ws_url": self.ws_url or "Not set"
+            }
+        )
         
         if not self.is_configured():
             logger.warning("[LiveKitService] LiveKit credentials not configured properly. Voice interviews will be disabled.")
@@ -26,12 +68,78 @@ class LiveKitService:
     
     def is_configured(self) -> bool:
         """Check if LiveKit is properly configured"""
-        return bool(self.api_key and self.api_secret and self.ws_url)
+        return self._configured
     
     def get_websocket_url(self) -> Optional[str]:
         """Get the WebSocket URL"""
         return self.ws_url
     
+    def get_api(self) -> "api.LiveKitAPI":
+        """Shared LiveKit server API client (call from the event loop that serves requests)"""
+        if self._api is None:
+            import aiohttp
+            from livekit import api
+            
+            # Keep-alive pool so dispatches skip the TCP/TLS handshake to the LiveKit server
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=60)
+            )
+            self._api = api.LiveKitAPI(
+                self.ws_url,
+                self.api_key,
+                self.api_secret,
+                session=self._http_session
+            )
+        return self._api
+    
+    async def dispatch_agent(
+        self,
+        room_name: str,
+        agent_name: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Ask the running agent worker to join a room"""
+        if not self._configured:
+            raise Exception("LiveKit not configured")
+        
+        from livekit import api
+        
+        dispatch = await self.get_api().agent_dispatch.create_dispatch(
+            api.CreateAgentDispatchRequest(
+                agent_name=agent_name,
+                room=room_name,
+                metadata=orjson.dumps(metadata or {}).decode()
+            )
+        )
+        logger.info(f"[LiveKitService] Dispatched agent {agent_name} to room {room_name} (dispatch {dispatch.id})")
+    
+    async def delete_room(self, room_name: str) -> bool:
+        """Delete a room, disconnecting its participants and the dispatched agent; returns whether it existed"""
+        if not self._configured:
+            raise Exception("LiveKit not configured")
+        
+        from livekit import api
+        
+        try:
+            await self.get_api().room.delete_room(api.DeleteRoomRequest(room=room_name))
+        except api.TwirpError as error:
+            if error.code != api.TwirpErrorCode.NOT_FOUND:
+                raise
+            logger.info("[LiveKitService] Room {} already gone", room_name)
+            return False
+        logger.info("[LiveKitService] Deleted room {}", room_name)
+        return True
+    
+    async def aclose(self) -> None:
+        """Close the server API client and its connection pool"""
+        if self._api is not None:
+            await self._api.aclose()
+            self._api = None
+        if self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
+    
     async def generate_access_token(
         self,
         room_name: str,
@@ -39,37 +147,39 @@ class LiveKitService:
         metadata: Optional[Dict[str, Any]] = None
     ) -> str:
         """Generate access token for a participant"""
-        if not self.is_configured():
+        return await self._generate_token(participant_name, metadata, self.room_grants(room_name))
+    
+    @staticmethod
+    def room_grants(room_name: str) -> Dict[str, Any]:
+        """Video grant claims for joining room_name and publishing/subscribing in it"""
+        return dict(_GRANTS_TEMPLATE, room=room_name)
+    
+    async def _generate_token(
+        self,
+        participant_name: str,
+        metadata: Optional[Dict[str, Any]],
+        grants: Dict[str, Any],
+        issued_at: Optional[int] = None
+    ) -> str:
+        if not self._configured:
             raise Exception("LiveKit not configured")
         
-        logger.info(f"[LiveKitService] Generating access token for {participant_name} in room {room_name}")
+        logger.info("[LiveKitService] Generating access token for {} in room {}", participant_name, grants["room"])
         
         try:
-            token = api.AccessToken(self.api_key, self.api_secret)
-            # Set the participant's identity (required)
-            token.with_identity(participant_name)
-            # Optionally set a display name
-            token.with_name(participant_name)
-            
+            # Same claims api.AccessToken(...).with_identity/with_name/with_metadata/with_grants
+            # would produce, signed directly
+            claims: Dict[str, Any] = {"name": participant_name}
             if metadata:
-                token.with_metadata(str(metadata))
+                claims["metadata"] = orjson.dumps(metadata).decode()
+            claims["video"] = grants
             
-            # Set room and permissions via VideoGrants
-            token.with_grants(api.VideoGrants(
-                room_join=True,      # Allow joining the room
-                room=room_name,      # Specify the room name (required for agent dispatch)
-                can_publish=True,
-                can_subscribe=True,
-                can_publish_data=True,
-                can_update_own_metadata=True
-            ))
-
             # Log for verification
-            logger.debug(f"[LiveKitService] AccessToken identity set to: {participant_name}")
-            logger.debug(f"[LiveKitService] AccessToken grants: room={room_name}, room_join=True")
+            logger.debug("[LiveKitService] AccessToken identity set to: {}", participant_name)
+            logger.debug("[LiveKitService] AccessToken grants: room={}, room_join=True", grants["room"])
 
-            jwt_token = token.to_jwt()
-            logger.info(f"[LiveKitService] Token generated successfully, length: {len(jwt_token)}")
+            jwt_token = self.sign_token(participant_name, claims, issued_at)
+            logger.info("[LiveKitService] Token generated successfully, length: {}", len(jwt_token))
             
             return jwt_token
             
@@ -77,38 +187,49 @@ class LiveKitService:
             logger.error(f"[LiveKitService] Error generating access token: {error}")
             raise Exception(f"Failed to generate access token: {error}")
     
+    def sign_token(self, identity: str, claims: Dict[str, Any], issued_at: Optional[int] = None) -> str:
+        """Encode and HS256-sign LiveKit access token claims for identity"""
+        now = int(time.time()) if issued_at is None else issued_at
+        payload = dict(claims, sub=identity, iss=self.api_key, nbf=now, exp=now + TOKEN_TTL_SECONDS)
+        signing_input = self._HEADER_B64 + b"." + _b64url(orjson.dumps(payload))
+        # hmac.digest runs HMAC-SHA256 in OpenSSL in a single call
+        signature = hmac.digest(self._signing_key, signing_input, hashlib.sha256)
+        return (signing_input + b"." + _b64url(signature)).decode("ascii")
+    
     async def create_interview_room(
         self,
         interview_config: Dict[str, Any],
         participant_name: str
     ) -> Dict[str, Any]:
         """Create a new interview room"""
-        import time
-        import random
-        import string
-        
-        room_name = f"interview-{int(time.time())}-{''.join(random.choices(string.ascii_lowercase, k=9))}"
+        # One timestamp for the room name, the interviewer identity and both tokens
+        now = int(time.time())
+        room_name = f"interview-{now}-{secrets.token_hex(5)}"
+        grants = self.room_grants(room_name)
         
         try:
             # Generate tokens for both participant and AI interviewer
-            participant_token = await self.generate_access_token(
-                room_name,
-                participant_name,
-                {
-                    "role": "candidate",
-                    "config": interview_config,
-                    "joined_at": "2024-01-01T00:00:00Z"
-                }
-            )
-            
-            interviewer_token = await self.generate_access_token(
-                room_name,
-                f"ai-interviewer-{int(time.time())}",
-                {
-                    "role": "interviewer",
-                    "config": interview_config,
-                    "is_bot": True
-                }
+            participant_token, interviewer_token = await asyncio.gather(
+                self._generate_token(
+                    participant_name,
+                    {
+                        "role": "candidate",
+                        "config": interview_config,
+                        "joined_at": "2024-01-01T00:00:00Z"
+                    },
+                    grants,
+                    now
+                ),
+                self._generate_token(
+                    f"ai-interviewer-{now}",
+                    {
+                        "role": "interviewer",
+                        "config": interview_config,
+                        "is_bot": True
+                    },
+                    grants,
+                    now
+                )
             )
             
             room_data = {
@@ -119,7 +240,7 @@ class LiveKitService:
                 "config": interview_config
             }
             
-            logger.info(f"[LiveKitService] Room created: {room_name}")
+            logger.info("[LiveKitService] Room created: {}", room_name)
             return room_data
             
         except Exception as error:
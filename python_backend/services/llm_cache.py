@@ -0,0 +1,182 @@
+"""
+Response cache for the LLM-backed API endpoints
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+from functools import cache
+import asyncio
+import difflib
+import hashlib
+import time
+from loguru import logger
+import orjson
+
+# How many recent payloads per namespace a similarity lookup compares against
+SIMILARITY_CANDIDATES = 64
+# Longer texts only match exactly: SequenceMatcher.ratio() is quadratic in the text length
+SIMILARITY_MAX_CHARS = 2000
+
+class LLMResponseCache:
+    """
+    TTL-bounded LRU cache of endpoint results.
+    
+    Lookups match the SHA-256 of the canonical (sorted-key JSON) payload first.
+    Callers can name one free-text payload field (similar_field) to also accept
+    a recent entry whose other fields are identical and whose text in that field
+    is at least `threshold` similar (difflib ratio).
+    """
+    
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        # Computations currently running, so concurrent identical requests share one call
+        self._inflight: Dict[Tuple[str, str], "asyncio.Future[Any]"] = {}
+        # key -> (expires_at, hash of the payload without similar_field, that field's text, value)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, str, str, Any]]" = OrderedDict()
+    
+    @staticmethod
+    def canonicalize(value: Any) -> bytes:
+        """Sorted-key JSON, byte for byte; answer text is not folded since case and spacing can change an analysis"""
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    
+    @staticmethod
+    def _hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+    
+    def _get_exact(self, key: Tuple[str, str]) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, _, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    def _get_similar(self, namespace: str, group: str, text: str, threshold: float) -> Optional[Any]:
+        now = time.monotonic()
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(text)
+        best_value, best_ratio = None, threshold
+        checked = 0
+        # Most recently used entries first
+        for (entry_namespace, _), (expires_at, entry_group, entry_text, value) in reversed(self._entries.items()):
+            if (
+                entry_namespace != namespace
+                or entry_group != group
+                or expires_at < now
+                or len(entry_text) > SIMILARITY_MAX_CHARS
+            ):
+                continue
+            checked += 1
+            matcher.set_seq1(entry_text)
+            if matcher.real_quick_ratio() >= best_ratio and matcher.quick_ratio() >= best_ratio:
+                ratio = matcher.ratio()
+                if ratio >= best_ratio:
+                    best_value, best_ratio = value, ratio
+            if checked >= SIMILARITY_CANDIDATES:
+                break
+        return best_value
+    
+    def set(
+        self,
+        key: Tuple[str, str],
+        group: str,
+        text: str,
+        value: Any,
+        ttl_seconds: Optional[float] = None
+    ) -> None:
+        self._entries[key] = (time.monotonic() + (ttl_seconds or self.ttl_seconds), group, text, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    async def get_or_compute(
+        self,
+        namespace: str,
+        payload: Dict[str, Any],
+        compute: Callable[[], Awaitable[Any]],
+        similar_field: Optional[str] = None,
+        threshold: float = 0.92,
+        ttl_seconds: Optional[float] = None,
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """Return the cached result for payload, or await compute() and cache it
+        
+        Concurrent calls with the same payload share one compute(). Results rejected by
+        cacheable (e.g. heuristic fallbacks) are returned but not stored.
+        Cached results are shared and must not be mutated.
+        """
+        key = (namespace, self._hash(self.canonicalize(payload)))
+        if similar_field is None:
+            group, text = "", ""
+        else:
+            group = self._hash(self.canonicalize({k: v for k, v in payload.items() if k != similar_field}))
+            # Folded for the similarity comparison only; exact keys use the text as sent
+            text = " ".join(str(payload.get(similar_field, "")).lower().split())
+        
+        cached = self._get_exact(key)
+        if cached is not None:
+            self.hits += 1
+            logger.info(f"[LLMResponseCache] Exact hit for {namespace}")
+            return cached
+        
+        if similar_field is not None and len(text) <= SIMILARITY_MAX_CHARS:
+            cached = self._get_similar(namespace, group, text, threshold)
+            if cached is not None:
+                self.similar_hits += 1
+                logger.info(f"[LLMResponseCache] Similar hit for {namespace}")
+                return cached
+        
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            self.misses += 1
+            inflight = asyncio.ensure_future(
+                self._compute_and_store(key, group, text, compute, ttl_seconds, cacheable)
+            )
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+            logger.info(f"[LLMResponseCache] Joining in-flight request for {namespace}")
+        
+        # Shielded so one caller disconnecting does not cancel the call for the others
+        return await asyncio.shield(inflight)
+    
+    async def _compute_and_store(
+        self,
+        key: Tuple[str, str],
+        group: str,
+        text: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[float],
+        cacheable: Optional[Callable[[Any], bool]]
+    ) -> Any:
+        result = await compute()
+        if result is not None and (cacheable is None or cacheable(result)):
+            self.set(key, group, text, result, ttl_seconds)
+        return result
+    
+    def clear(self) -> None:
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.similar_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.similar_hits) / lookups if lookups else 0.0
+        }
+
+@cache
+def get_llm_cache() -> LLMResponseCache:
+    """Process-wide endpoint response cache"""
+    return LLMResponseCache()
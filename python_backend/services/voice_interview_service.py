@@ -1,74 +1,141 @@
 """
 Voice Interview Service for Python backend
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass, field
 from loguru import logger
+import msgspec
+import orjson
 
 from .livekit_service import LiveKitService
-from models.interview_models import InterviewConfig
+from models.interview_models import InterviewConfigMsg
+
+# Questions per interview used for progress reporting
+DEFAULT_TOTAL_QUESTIONS = 5
+
+@dataclass
+class SessionStore:
+    """Active sessions stored column-wise; _index maps a session id to its row"""
+    session_ids: List[str] = field(default_factory=list)
+    room_names: List[str] = field(default_factory=list)
+    statuses: List[str] = field(default_factory=list)
+    participant_names: List[str] = field(default_factory=list)
+    current_idx: List[int] = field(default_factory=list)
+    start_times: List[str] = field(default_factory=list)
+    configs: List[Dict[str, Any]] = field(default_factory=list)
+    questions: List[List[Any]] = field(default_factory=list)
+    responses: List[List[Any]] = field(default_factory=list)
+    tokens: List[Tuple[str, str]] = field(default_factory=list)
+    _index: Dict[str, int] = field(default_factory=dict)
+    
+    def __len__(self) -> int:
+        return len(self.session_ids)
+    
+    def row(self, session_id: str) -> Optional[int]:
+        return self._index.get(session_id)
+    
+    def add(
+        self,
+        session_id: str,
+        room_name: str,
+        participant_name: str,
+        start_time: str,
+        config: Dict[str, Any],
+        tokens: Tuple[str, str],
+        status: str = "waiting"
+    ) -> None:
+        """Append a session, replacing any existing row with the same id"""
+        if session_id in self._index:
+            self.remove(session_id)
+        self._index[session_id] = len(self.session_ids)
+        self.session_ids.append(session_id)
+        self.room_names.append(room_name)
+        self.statuses.append(status)
+        self.participant_names.append(participant_name)
+        self.current_idx.append(0)
+        self.start_times.append(start_time)
+        self.configs.append(config)
+        self.questions.append([])
+        self.responses.append([])
+        self.tokens.append(tokens)
+    
+    def remove(self, session_id: str) -> bool:
+        """Drop a session by moving the last row into its place"""
+        row = self._index.pop(session_id, None)
+        if row is None:
+            return False
+        last = len(self.session_ids) - 1
+        for column in self._columns():
+            column[row] = column[last]
+            column.pop()
+        if row != last:
+            self._index[self.session_ids[row]] = row
+        return True
+    
+    def _columns(self) -> Tuple[list, ...]:
+        return (
+            self.session_ids,
+            self.room_names,
+            self.statuses,
+            self.participant_names,
+            self.current_idx,
+            self.start_times,
+            self.configs,
+            self.questions,
+            self.responses,
+            self.tokens
+        )
 
 class VoiceInterviewService:
     """Voice interview service for managing voice interview sessions"""
     
     def __init__(self, livekit_service: LiveKitService):
         self.livekit = livekit_service
-        self.active_interviews: Dict[str, Dict[str, Any]] = {}
+        self.sessions = SessionStore()
+        
+        # Serialized get_session_status results, dropped whenever the session changes
+        self._status_cache: Dict[str, bytes] = {}
         
         logger.info("[VoiceInterviewService] Voice interview service initialized")
     
     async def start_voice_interview(
         self,
-        config: InterviewConfig,
+        config: InterviewConfigMsg,
         participant_name: str,
         enable_ai_agent: bool = True,
         agent_provider: str = "google"
     ) -> Dict[str, Any]:
         """Start a new voice interview session"""
         try:
-            logger.info(f"[VoiceInterviewService] Starting voice interview for {participant_name}")
-            print(f"[VoiceInterviewService] participant_name: {participant_name}")  # <-- Add this line
+            logger.info("[VoiceInterviewService] Starting voice interview for {}", participant_name)
 
-            # Validate InterviewConfig
-            config_data = config.model_dump()
-            logger.debug(f"[VoiceInterviewService] InterviewConfig data: {config_data}")
-            required_fields = ["experience_level"]  # adjust as needed , "position", "language"
-            missing_fields = [f for f in required_fields if f not in config_data or config_data[f] is None]
-            if missing_fields:
-                logger.error(f"[VoiceInterviewService] Missing required config fields: {missing_fields}")
-                raise ValueError(f"Missing required config fields: {missing_fields}")
+            # Validated at the API boundary (experience_level is a required field); converted once
+            # and shared read-only by the room metadata, the session and the response
+            config_data = msgspec.to_builtins(config)
+            logger.debug("[VoiceInterviewService] InterviewConfig data: {}", config_data)
             
             # Log identity and room before room creation
-            logger.debug(f"[VoiceInterviewService] About to create LiveKit room for participant: {participant_name}")
-            logger.debug(f"[VoiceInterviewService] LiveKit config_data: {config_data}")
+            logger.debug("[VoiceInterviewService] About to create LiveKit room for participant: {}", participant_name)
 
             # Create LiveKit room
             room_data = await self.livekit.create_interview_room(
                 config_data,
                 participant_name
             )
-            logger.debug(f"[VoiceInterviewService] LiveKit room_data: {room_data}")
-            logger.debug(f"[VoiceInterviewService] participant_token: {room_data.get('participant_token')}, interviewer_token: {room_data.get('interviewer_token')}, room_name: {room_data.get('room_name')}")
+            logger.debug("[VoiceInterviewService] LiveKit room_data: {}", room_data)
 
             # Initialize interview session
             session_id = room_data["room_name"]
-            interview_session = {
-                "session_id": session_id,
-                "room_name": room_data["room_name"],
-                "config": config.model_dump(),
-                "participant_name": participant_name,
-                "start_time": "2024-01-01T00:00:00Z",
-                "current_question_index": 0,
-                "questions": [],
-                "responses": [],
-                "status": "waiting",  # waiting, active, paused, completed
-                "tokens": {
-                    "participant": room_data["participant_token"],
-                    "interviewer": room_data["interviewer_token"]
-                }
-            }
-            
-            # Store session
-            self.active_interviews[session_id] = interview_session
+            # Store session (status: waiting, active, paused, completed)
+            self.sessions.add(
+                session_id,
+                room_name=room_data["room_name"],
+                participant_name=participant_name,
+                start_time="2024-01-01T00:00:00Z",
+                config=config_data,
+                tokens=(room_data["participant_token"], room_data["interviewer_token"])
+            )
+            self._status_cache.pop(session_id, None)
             
             response_data = {
                 "session_id": session_id,
@@ -76,28 +143,28 @@ class VoiceInterviewService:
                 "ws_url": room_data["ws_url"],
                 "participant_token": room_data["participant_token"],
                 "first_question": "Welcome to your voice interview. Please wait for the first question.",
-                "config": config.model_dump(),
+                "config": config_data,
                 "ai_agent_enabled": enable_ai_agent,
                 "conversational_mode": enable_ai_agent,
                 "agent_provider": agent_provider
             }
             
-            logger.info(f"[VoiceInterviewService] Voice interview started successfully: {session_id}")
+            logger.info("[VoiceInterviewService] Voice interview started successfully: {}", session_id)
 
             # --- Debug: Check LiveKit audio agent setup ---
             if not room_data.get("participant_token") or not room_data.get("ws_url"):
                 logger.error("[VoiceInterviewService] LiveKit room missing participant_token or ws_url. Audio will not work.")
             else:
-                logger.info(f"[VoiceInterviewService] LiveKit participant_token and ws_url present for audio.")
+                logger.info("[VoiceInterviewService] LiveKit participant_token and ws_url present for audio.")
 
             # --- Debug: Log interviewer token and agent status ---
             if not room_data.get("interviewer_token"):
                 logger.warning("[VoiceInterviewService] interviewer_token missing. AI agent may not be connected.")
             else:
-                logger.info(f"[VoiceInterviewService] interviewer_token present: {room_data.get('interviewer_token')}")
+                logger.info("[VoiceInterviewService] interviewer_token present")
 
             # --- Debug: Log agent provider and AI agent enabled status ---
-            logger.info(f"[VoiceInterviewService] AI Agent enabled: {enable_ai_agent}, Provider: {agent_provider}")
+            logger.info("[VoiceInterviewService] AI Agent enabled: {}, Provider: {}", enable_ai_agent, agent_provider)
 
             return response_data
             
@@ -107,37 +174,78 @@ class VoiceInterviewService:
     
     def get_session_status(self, session_id: str) -> Dict[str, Any]:
         """Get interview session status"""
-        session = self.active_interviews.get(session_id)
-        if not session:
+        sessions = self.sessions
+        row = sessions.row(session_id)
+        if row is None:
             return {"found": False}
         
+        current = sessions.current_idx[row]
         return {
             "found": True,
             "session_id": session_id,
-            "status": session["status"],
+            "status": sessions.statuses[row],
             "progress": {
-                "current": session["current_question_index"],
-                "total": 5,  # Default total questions
-                "percentage": (session["current_question_index"] / 5) * 100
+                "current": current,
+                "total": DEFAULT_TOTAL_QUESTIONS,
+                "percentage": (current / DEFAULT_TOTAL_QUESTIONS) * 100
             },
             "duration": 0,  # Calculate based on timestamps
-            "questions_asked": len(session["questions"]),
-            "responses_given": len(session["responses"])
+            "questions_asked": len(sessions.questions[row]),
+            "responses_given": len(sessions.responses[row])
         }
     
+    def get_session_status_json(self, session_id: str) -> bytes:
+        """get_session_status as JSON bytes, reused until the session changes"""
+        cached = self._status_cache.get(session_id)
+        if cached is None:
+            cached = orjson.dumps(self.get_session_status(session_id))
+            if self.sessions.row(session_id) is not None:
+                self._status_cache[session_id] = cached
+        return cached
+    
+    def update_session(
+        self,
+        session_id: str,
+        status: Optional[str] = None,
+        current_question_index: Optional[int] = None
+    ) -> bool:
+        """Update a session's status or progress; returns whether the session exists"""
+        row = self.sessions.row(session_id)
+        if row is None:
+            return False
+        if status is not None:
+            self.sessions.statuses[row] = status
+        if current_question_index is not None:
+            self.sessions.current_idx[row] = current_question_index
+        self._status_cache.pop(session_id, None)
+        return True
+    
     def get_active_sessions(self) -> list:
         """Get all active sessions"""
-        sessions = []
-        for session_id, session in self.active_interviews.items():
-            sessions.append({
+        sessions = self.sessions
+        return [
+            {
                 "session_id": session_id,
-                "participant_name": session["participant_name"],
-                "status": session["status"],
-                "start_time": session["start_time"],
-                "config": session["config"],
+                "participant_name": participant_name,
+                "status": status,
+                "start_time": start_time,
+                "config": config,
                 "progress": {
-                    "current": session["current_question_index"],
-                    "total": 5
+                    "current": current,
+                    "total": DEFAULT_TOTAL_QUESTIONS
                 }
-            })
-        return sessions
\ No newline at end of file
+            }
+            for session_id, participant_name, status, start_time, config, current in zip(
+                sessions.session_ids,
+                sessions.participant_names,
+                sessions.statuses,
+                sessions.start_times,
+                sessions.configs,
+                sessions.current_idx
+            )
+        ]
+    
+    def end_session(self, session_id: str) -> bool:
+        """Forget a finished session; returns whether it was active"""
+        self._status_cache.pop(session_id, None)
+        return self.sessions.remove(session_id)
@@ -5,26 +5,53 @@ LiveKit Voice Agent: Enhanced Google AI integration with proper audio streaming
 import sys
 import os
 import asyncio
-import json
+import signal
 import io
+import re
 import wave
-from typing import Optional, Dict, Any
-from livekit.agents import VoiceAiAgent, VoiceAiAgentOptions, RoomOptions, AudioOptions
+from collections import deque
+from functools import cache
+from typing import Optional, Dict, Any, List, Tuple
 from livekit import rtc
 import numpy as np
+import orjson
 
-class GoogleAIVoiceAgent:
+# Points where streamed LLM text can be handed to TTS: sentence ends, or commas after a long enough clause
+SPEECH_BREAK = re.compile(r"[.?!]+\s+|,\s+")
+MIN_CLAUSE_WORDS = 4
+MAX_SPEECH_WORDS = 80
+
+def split_speakable(buffer: str) -> Tuple[List[str], str]:
+    """Split the text that is ready to speak off the front of buffer; returns the pieces and the remainder"""
+    pieces = []
+    start = 0
+    for match in SPEECH_BREAK.finditer(buffer):
+        piece = buffer[start:match.end()]
+        # Short clauses stay attached to the text that follows them
+        if match.group().startswith(",") and len(piece.split()) < MIN_CLAUSE_WORDS:
+            continue
+        pieces.append(piece.strip())
+        start = match.end()
+    rest = buffer[start:]
+    if len(rest.split()) > MAX_SPEECH_WORDS:
+        pieces.append(rest.strip())
+        rest = ""
+    return pieces, rest
+
+# Fixed part of every Gemini request, so each turn only sends the conversation delta
+INTERVIEWER_INSTRUCTIONS = (
+    "You are an AI interviewer conducting a professional interview. "
+    "Respond naturally as an interviewer. Keep responses conversational and engaging. "
+    "Ask follow-up questions or provide the next interview question as appropriate."
+)
+
+class GoogleClients:
+    """Gemini and Google Cloud clients shared by every voice agent in the process"""
+    
     def __init__(self):
-        self.room_name = None
-        self.agent_token = None
-        self.room = None
-        self.audio_source = None
-        self.audio_track = None
-        self.is_speaking = False
-        self.is_listening = False
-        self.conversation_history = []
-        
-        # Initialize Google services
+        self.gemini_model = None
+        self.tts_client = None
+        self.speech_client = None
         self.setup_google_services()
         
     def setup_google_services(self):
@@ -35,25 +62,89 @@ class GoogleAIVoiceAgent:
                 from google.generativeai import GenerativeModel
                 import google.generativeai as genai
                 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-                self.gemini_model = GenerativeModel('gemini-2.0-flash-exp')
+                self.gemini_model = GenerativeModel(
+                    'gemini-2.0-flash-exp',
+                    system_instruction=INTERVIEWER_INSTRUCTIONS
+                )
                 print("✅ Google Gemini AI initialized")
             
-            # Google Cloud Text-to-Speech
+            # Google Cloud Text-to-Speech (async client so synthesis never blocks the event loop)
             if os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
                 from google.cloud import texttospeech
-                self.tts_client = texttospeech.TextToSpeechClient()
+                self.tts_client = texttospeech.TextToSpeechAsyncClient()
                 print("✅ Google Cloud TTS initialized")
             
-            # Google Cloud Speech-to-Text
+            # Google Cloud Speech-to-Text (async client for the persistent streaming call)
             if os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
                 from google.cloud import speech
-                self.speech_client = speech.SpeechClient()
+                self.speech_client = speech.SpeechAsyncClient()
                 print("✅ Google Cloud STT initialized")
                 
         except Exception as e:
             print(f"❌ Error initializing Google services: {e}")
+
+@cache
+def get_google_clients() -> GoogleClients:
+    """Process-wide Google clients, created on first use"""
+    return GoogleClients()
+
+class GoogleAIVoiceAgent:
+    # Streaming synthesis only accepts Chirp 3 HD voices; the batch path keeps Neural2
+    STREAMING_TTS_VOICE = "en-US-Chirp3-HD-Aoede"
+    BATCH_TTS_VOICE = "en-US-Neural2-F"
+    # Audio buffered in the LiveKit source ahead of playback (must be a multiple of 10)
+    AUDIO_QUEUE_MS = 200
+    # Samples per frame passed to capture_frame: 100ms at 24kHz, so each FFI call carries more audio
+    FRAME_SAMPLES = 2400
+    # Streamed TTS audio buffered before playback starts
+    PREBUFFER_MS = 500
+    # Length of the fade applied at each end of an utterance: 10ms at 24kHz
+    FADE_SAMPLES = 240
+    _FADE_IN = np.linspace(0.0, 1.0, FADE_SAMPLES, dtype=np.float32)
+    _FADE_OUT = _FADE_IN[::-1].copy()
+    
+    def __init__(self, clients: Optional[GoogleClients] = None):
+        self.room_name = None
+        self.agent_token = None
+        self.room = None
+        self.audio_source = None
+        self.audio_track = None
+        self.is_speaking = False
+        self.is_listening = False
+        # Participant audio track; its frame handler is attached only while listening and not speaking
+        self._user_audio_track = None
+        self._frames_attached = False
+        # Last five exchanges, already formatted for the prompt
+        self.conversation_history = deque(maxlen=5)
+        # Incoming audio waiting to be sent to the streaming recognizer
+        self._stt_queue: asyncio.Queue = asyncio.Queue()
+        self._stt_task = None
+        # Set to make run() leave the room (signal handlers, room disconnect)
+        self._shutdown = asyncio.Event()
+        # Data channel sequence numbers (sent, last received)
+        self._sent_seq = 0
+        self._received_seq: Optional[int] = None
+        self.streaming_tts = os.getenv("GOOGLE_TTS_STREAMING", "true").lower() != "false"
+        
+        # Reuse the process-wide Google clients; channels and auth are set up once
+        clients = clients or get_google_clients()
+        self.gemini_model = clients.gemini_model
+        self.tts_client = clients.tts_client
+        self.speech_client = clients.speech_client
+        
+    async def run(self, room_name: str, agent_token: str, ws_url: Optional[str] = None):
+        """Connect and stay in the room until shutdown is requested or the task is cancelled"""
+        try:
+            await self.connect_to_room(room_name, agent_token, ws_url)
+            print("✅ Google AI Voice Agent is running...")
+            await self._shutdown.wait()
+        finally:
+            if self._stt_task:
+                self._stt_task.cancel()
+            if self.room:
+                await self.room.disconnect()
             
-    async def connect_to_room(self, room_name: str, agent_token: str):
+    async def connect_to_room(self, room_name: str, agent_token: str, ws_url: Optional[str] = None):
         """Connect to LiveKit room as AI agent"""
         self.room_name = room_name
         self.agent_token = agent_token
@@ -68,16 +159,21 @@ class GoogleAIVoiceAgent:
             self.room.on("participant_connected", self.on_participant_connected)
             self.room.on("track_subscribed", self.on_track_subscribed)
             self.room.on("data_received", self.on_data_received)
+            self.room.on("disconnected", lambda *_: self._shutdown.set())
             
             # Connect to the room
             await self.room.connect(
-                url=os.getenv("LIVEKIT_WS_URL"),
+                url=ws_url or os.getenv("LIVEKIT_WS_URL"),
                 token=agent_token
             )
             
             # Create and publish audio track
             await self.setup_audio_track()
             
+            # Start recognizing speech from queued audio frames
+            if self.speech_client is not None:
+                self._stt_task = asyncio.create_task(self.run_speech_recognition())
+            
             print("✅ Google AI Agent connected successfully")
             
             # Send initial greeting
@@ -93,9 +189,15 @@ class GoogleAIVoiceAgent:
             # Create audio source
             self.audio_source = rtc.AudioSource(
                 sample_rate=24000,  # Google TTS default
-                num_channels=1
+                num_channels=1,
+                # capture_frame waits while this much audio is queued, which paces playback
+                queue_size_ms=self.AUDIO_QUEUE_MS
             )
             
+            # One output frame reused for every capture: capture_frame has copied it by the time it returns
+            self._output_frame = rtc.AudioFrame.create(24000, 1, self.FRAME_SAMPLES)
+            self._frame_samples = np.frombuffer(self._output_frame.data, dtype=np.int16)
+            
             # Create audio track
             self.audio_track = rtc.LocalAudioTrack.create_audio_track(
                 "ai-speech",
@@ -122,82 +224,188 @@ class GoogleAIVoiceAgent:
             "type": "greeting",
             "text": greeting,
             "timestamp": asyncio.get_event_loop().time()
-        })
+        }, reliable=False)
         
         # Speak the greeting
         await self.speak_text(greeting)
         
     async def speak_text(self, text: str):
         """Convert text to speech using Google TTS and stream to LiveKit"""
-        if not hasattr(self, 'tts_client') or not self.audio_source:
+        speech_queue: asyncio.Queue = asyncio.Queue()
+        speech_queue.put_nowait(text)
+        speech_queue.put_nowait(None)
+        await self.speak_queued(speech_queue)
+            
+    async def speak_queued(self, speech_queue: asyncio.Queue):
+        """Speak queued text until a None sentinel arrives
+        
+        Synthesis of each piece starts as soon as it is queued; only playback
+        is serialized, in queue order. Listening is paused for the whole reply.
+        """
+        if self.tts_client is None or not self.audio_source:
             print("⚠️ TTS client or audio source not available")
             return
-            
+        
+        playback: asyncio.Queue = asyncio.Queue()
+        player = asyncio.create_task(self.play_utterances(playback))
+        synthesis_tasks = []
+        self.is_speaking = True
+        self._stop_listening()
         try:
-            self.is_speaking = True
-            print(f"🗣️ Google AI speaking: {text[:50]}...")
-            
-            # Configure TTS request
-            synthesis_input = {"text": text}
-            voice = {
-                "language_code": "en-US",
-                "name": "en-US-Neural2-F",  # Female voice
-                "ssml_gender": "FEMALE"
-            }
-            audio_config = {
-                "audio_encoding": "LINEAR16",
-                "sample_rate_hertz": 24000,
-                "speaking_rate": 1.0,
-                "pitch": 0.0,
-                "volume_gain_db": 0.0
-            }
-            
-            # Synthesize speech
-            response = self.tts_client.synthesize_speech(
-                input=synthesis_input,
-                voice=voice,
-                audio_config=audio_config
-            )
-            
-            # Convert audio to proper format for LiveKit
-            await self.stream_audio_to_livekit(response.audio_content)
-            
-        except Exception as e:
-            print(f"❌ Error in Google TTS: {e}")
+            while True:
+                text = await speech_queue.get()
+                if text is None:
+                    break
+                print(f"🗣️ Google AI speaking: {text[:50]}...")
+                audio_queue: asyncio.Queue = asyncio.Queue()
+                synthesis_tasks.append(asyncio.create_task(self.synthesize_to_queue(text, audio_queue)))
+                playback.put_nowait(audio_queue)
+            playback.put_nowait(None)
+            await player
         finally:
+            player.cancel()
+            for task in synthesis_tasks:
+                task.cancel()
             self.is_speaking = False
+            if self.is_listening:
+                self._start_listening()
             
-    async def stream_audio_to_livekit(self, audio_data: bytes):
-        """Stream audio data to LiveKit room"""
+    async def synthesize_to_queue(self, text: str, audio_queue: asyncio.Queue):
+        """Put synthesized audio for text on audio_queue as it arrives, then a None sentinel"""
         try:
-            # Convert audio data to numpy array
-            audio_array = np.frombuffer(audio_data, dtype=np.int16)
-            
-            # Convert to float32 and normalize
-            audio_float = audio_array.astype(np.float32) / 32768.0
+            if self.streaming_tts:
+                async for audio in self.synthesize_streaming(text):
+                    audio_queue.put_nowait(audio)
+            else:
+                audio_queue.put_nowait(await self.synthesize_batch(text))
+        except Exception as e:
+            print(f"❌ Error in Google TTS: {e}")
+        finally:
+            audio_queue.put_nowait(None)
             
-            # Stream in chunks
-            chunk_size = 480  # 20ms at 24kHz
-            for i in range(0, len(audio_float), chunk_size):
-                chunk = audio_float[i:i + chunk_size]
-                
-                # Pad if necessary
-                if len(chunk) < chunk_size:
-                    chunk = np.pad(chunk, (0, chunk_size - len(chunk)))
-                
-                # Create audio frame
-                frame = rtc.AudioFrame(
-                    data=chunk.tobytes(),
-                    sample_rate=24000,
-                    num_channels=1,
-                    samples_per_channel=len(chunk)
+    async def synthesize_streaming(self, text: str):
+        """Yield audio chunks as Google TTS streams them"""
+        from google.cloud import texttospeech
+        
+        async def requests():
+            # The first request carries only the config, later ones carry the text
+            yield texttospeech.StreamingSynthesizeRequest(
+                streaming_config=texttospeech.StreamingSynthesizeConfig(
+                    voice=texttospeech.VoiceSelectionParams(
+                        language_code="en-US",
+                        name=self.STREAMING_TTS_VOICE
+                    )
                 )
+            )
+            yield texttospeech.StreamingSynthesizeRequest(
+                input=texttospeech.StreamingSynthesisInput(text=text)
+            )
+        
+        # Streaming output is headerless 24kHz mono LINEAR16, matching the audio source
+        responses = await self.tts_client.streaming_synthesize(requests=requests())
+        async for response in responses:
+            yield response.audio_content
+            
+    async def synthesize_batch(self, text: str) -> bytes:
+        """Synthesize the whole utterance at once (set GOOGLE_TTS_STREAMING=false)"""
+        # Configure TTS request
+        synthesis_input = {"text": text}
+        voice = {
+            "language_code": "en-US",
+            "name": self.BATCH_TTS_VOICE,
+            "ssml_gender": "FEMALE"
+        }
+        audio_config = {
+            "audio_encoding": "LINEAR16",
+            "sample_rate_hertz": 24000,
+            "speaking_rate": 1.0,
+            "pitch": 0.0,
+            "volume_gain_db": 0.0
+        }
+        
+        # Synthesize speech
+        response = await self.tts_client.synthesize_speech(
+            input=synthesis_input,
+            voice=voice,
+            audio_config=audio_config
+        )
+        return response.audio_content
+            
+    async def play_utterances(self, playback: asyncio.Queue):
+        """Play queued utterance audio queues one after another until a None sentinel"""
+        # Only the first utterance of a reply is pre-buffered; later ones were synthesized while it played
+        prebuffer = True
+        while True:
+            audio_queue = await playback.get()
+            if audio_queue is None:
+                return
+            try:
+                await self.play_audio_queue(audio_queue, prebuffer)
+            except Exception as e:
+                print(f"❌ Error playing TTS audio: {e}")
+            prebuffer = False
+            
+    async def play_audio_queue(self, audio_queue: asyncio.Queue, prebuffer: bool):
+        """Stream one utterance's audio chunks to LiveKit as they arrive, fading its ends"""
+        prebuffer_bytes = 24000 * 2 * self.PREBUFFER_MS // 1000 if prebuffer else 0
+        frame_bytes = self.FRAME_SAMPLES * 2
+        fade_bytes = self.FADE_SAMPLES * 2
+        buffer = bytearray()
+        playing = False
+        while True:
+            audio = await audio_queue.get()
+            if audio is None:
+                break
+            buffer += audio
+            # Hold playback until enough audio is buffered to ride out late chunks
+            if not playing and len(buffer) < prebuffer_bytes:
+                continue
+            # Send whole frames only; the remainder waits for the next chunk instead of being padded.
+            # At least one fade length is held back so the end of the utterance can be faded out.
+            ready = len(buffer) - fade_bytes
+            ready -= ready % frame_bytes
+            if ready <= 0:
+                continue
+            await self.stream_audio_to_livekit(bytes(buffer[:ready]), fade_in=not playing)
+            playing = True
+            del buffer[:ready]
+        if buffer:
+            await self.stream_audio_to_livekit(
+                bytes(buffer[:len(buffer) & ~1]),
+                fade_in=not playing,
+                fade_out=True
+            )
+            
+    async def stream_audio_to_livekit(self, audio_data: bytes, fade_in: bool = False, fade_out: bool = False):
+        """Stream 16-bit PCM audio data to LiveKit room, optionally ramping the first/last FADE_SAMPLES"""
+        try:
+            # AudioFrame takes int16 PCM as is, so the samples are never converted
+            samples = np.frombuffer(audio_data, dtype=np.int16)
+            
+            # Copy each chunk into the reused frame; a partial last chunk is zero-padded in place
+            chunk_size = self.FRAME_SAMPLES
+            frame_samples = self._frame_samples
+            for start in range(0, len(samples), chunk_size):
+                chunk = samples[start:start + chunk_size]
+                count = len(chunk)
+                frame_samples[:count] = chunk
+                frame_samples[count:] = 0
                 
-                # Capture frame to audio source
-                await self.audio_source.capture_frame(frame)
+                # Ramp utterance edges to and from silence so sentence boundaries do not click
+                if fade_in and start == 0:
+                    head = min(count, self.FADE_SAMPLES)
+                    np.multiply(frame_samples[:head], self._FADE_IN[:head], out=frame_samples[:head], casting="unsafe")
+                if fade_out and start + count == len(samples):
+                    tail = min(count, self.FADE_SAMPLES)
+                    np.multiply(
+                        frame_samples[count - tail:count],
+                        self._FADE_OUT[-tail:],
+                        out=frame_samples[count - tail:count],
+                        casting="unsafe"
+                    )
                 
-                # Small delay to maintain real-time playback
-                await asyncio.sleep(0.02)  # 20ms
+                # Capture frame to audio source; blocks while the source queue is full
+                await self.audio_source.capture_frame(self._output_frame)
                 
             print("✅ Audio streaming completed")
             
@@ -214,139 +422,144 @@ class GoogleAIVoiceAgent:
             print(f"🎤 Subscribed to audio track from: {participant.identity}")
             
             # Set up audio processing for speech recognition
-            track.on("frame_received", self.on_audio_frame)
+            self._stop_listening()
+            self._user_audio_track = track
+            if self.is_listening and not self.is_speaking:
+                self._start_listening()
+            
+    def _start_listening(self):
+        """Start receiving participant audio frames"""
+        if self._user_audio_track is not None and not self._frames_attached:
+            self._user_audio_track.on("frame_received", self.on_audio_frame)
+            self._frames_attached = True
+            
+    def _stop_listening(self):
+        """Stop receiving participant audio frames, so none are dispatched while they would be ignored"""
+        if self._frames_attached:
+            self._user_audio_track.off("frame_received", self.on_audio_frame)
+            self._frames_attached = False
             
     async def on_audio_frame(self, frame):
-        """Process incoming audio frame for speech recognition"""
-        if self.is_speaking or not self.is_listening:
-            return
-            
-        try:
-            # Convert frame to format suitable for Google STT
-            # This is a simplified version - you might need more sophisticated buffering
-            audio_data = frame.data
-            
-            # Process with Google Speech-to-Text
-            await self.process_speech_recognition(audio_data)
+        """Queue incoming audio frame for the streaming recognizer"""
+        self._stt_queue.put_nowait(bytes(frame.data))
             
-        except Exception as e:
-            print(f"❌ Error processing audio frame: {e}")
-            
-    async def process_speech_recognition(self, audio_data: bytes):
-        """Process audio with Google Speech-to-Text"""
-        if not hasattr(self, 'speech_client'):
-            return
-            
-        try:
-            # Configure recognition
-            config = {
-                "encoding": "LINEAR16",
-                "sample_rate_hertz": 24000,
-                "language_code": "en-US",
-                "enable_automatic_punctuation": True,
-                "model": "latest_long"
-            }
-            
-            audio = {"content": audio_data}
-            
-            # Recognize speech
-            response = self.speech_client.recognize(
-                config=config,
-                audio=audio
-            )
-            
-            # Process results
-            for result in response.results:
-                if result.alternatives:
-                    transcript = result.alternatives[0].transcript
-                    confidence = result.alternatives[0].confidence
-                    
-                    if confidence > 0.7:  # Only process high-confidence results
-                        await self.handle_user_speech(transcript)
-                        
-        except Exception as e:
-            print(f"❌ Error in speech recognition: {e}")
+    async def run_speech_recognition(self):
+        """Feed queued audio to one streaming Google Speech-to-Text call at a time"""
+        from google.cloud import speech
+        
+        streaming_config = speech.StreamingRecognitionConfig(
+            config=speech.RecognitionConfig(
+                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+                sample_rate_hertz=24000,
+                language_code="en-US",
+                enable_automatic_punctuation=True,
+                model="latest_long"
+            ),
+            interim_results=False,
+            single_utterance=False
+        )
+        
+        async def requests(first_chunk: bytes):
+            # The first request carries only the config, later ones carry audio
+            yield speech.StreamingRecognizeRequest(streaming_config=streaming_config)
+            yield speech.StreamingRecognizeRequest(audio_content=first_chunk)
+            while True:
+                yield speech.StreamingRecognizeRequest(audio_content=await self._stt_queue.get())
+        
+        while True:
+            # Open the stream only once audio arrives; Google closes streams that go quiet or run too long
+            first_chunk = await self._stt_queue.get()
+            try:
+                responses = await self.speech_client.streaming_recognize(requests=requests(first_chunk))
+                async for response in responses:
+                    for result in response.results:
+                        if result.is_final and result.alternatives:
+                            transcript = result.alternatives[0].transcript
+                            confidence = result.alternatives[0].confidence
+                            
+                            if confidence > 0.7:  # Only process high-confidence results
+                                await self.handle_user_speech(transcript)
+                                
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Error in speech recognition: {e}")
             
     async def handle_user_speech(self, transcript: str):
         """Handle recognized user speech"""
         print(f"👤 User said: {transcript}")
         
         # Add to conversation history
-        self.conversation_history.append({
-            "speaker": "user",
-            "message": transcript,
-            "timestamp": asyncio.get_event_loop().time()
-        })
+        self.conversation_history.append(f"Candidate: {transcript}")
         
         # Send data message to frontend
         await self.send_data_message({
             "type": "user_speech",
             "text": transcript,
             "timestamp": asyncio.get_event_loop().time()
-        })
+        }, reliable=False)
         
         # Generate AI response
         await self.generate_ai_response(transcript)
         
     async def generate_ai_response(self, user_input: str):
         """Generate AI response using Google Gemini"""
-        if not hasattr(self, 'gemini_model'):
+        if self.gemini_model is None:
             return
             
         try:
             # Create context from conversation history
             context = self.build_conversation_context()
             
-            # Generate response
-            prompt = f"""
-            You are an AI interviewer conducting a professional interview. 
-            
-            Context: {context}
-            
-            User just said: "{user_input}"
-            
-            Respond naturally as an interviewer. Keep responses conversational and engaging.
-            Ask follow-up questions or provide the next interview question as appropriate.
-            """
-            
-            response = await self.gemini_model.generate_content_async(prompt)
-            ai_response = response.text
+            # Generate response; the interviewer instructions are the model's system instruction
+            prompt = f'Context: {context}\n\nUser just said: "{user_input}"'
+            
+            # Synthesize each sentence as soon as it is complete while the rest is still generating
+            speech_queue: asyncio.Queue = asyncio.Queue()
+            speaker = asyncio.create_task(self.speak_queued(speech_queue))
+            parts = []
+            buffer = ""
+            try:
+                response = await self.gemini_model.generate_content_async(prompt, stream=True)
+                async for chunk in response:
+                    parts.append(chunk.text)
+                    pieces, buffer = split_speakable(buffer + chunk.text)
+                    for piece in pieces:
+                        speech_queue.put_nowait(piece)
+                if buffer.strip():
+                    speech_queue.put_nowait(buffer.strip())
+            finally:
+                speech_queue.put_nowait(None)
+            ai_response = "".join(parts)
             
             # Add to conversation history
-            self.conversation_history.append({
-                "speaker": "ai",
-                "message": ai_response,
-                "timestamp": asyncio.get_event_loop().time()
-            })
+            self.conversation_history.append(f"Interviewer: {ai_response}")
             
             # Send data message
             await self.send_data_message({
                 "type": "ai_response",
                 "text": ai_response,
                 "timestamp": asyncio.get_event_loop().time()
-            })
+            }, reliable=False)
             
-            # Speak the response
-            await self.speak_text(ai_response)
+            # Wait for the remaining sentences to finish playing
+            await speaker
             
         except Exception as e:
             print(f"❌ Error generating AI response: {e}")
             
     def build_conversation_context(self) -> str:
         """Build conversation context from history"""
-        context_parts = []
-        for entry in self.conversation_history[-5:]:  # Last 5 exchanges
-            speaker = "Interviewer" if entry["speaker"] == "ai" else "Candidate"
-            context_parts.append(f"{speaker}: {entry['message']}")
-        return "\n".join(context_parts)
+        return "\n".join(self.conversation_history)
         
-    async def send_data_message(self, data: Dict[str, Any]):
-        """Send data message to room participants"""
+    async def send_data_message(self, data: Dict[str, Any], reliable: bool = True):
+        """Send data message to room participants (reliable=False for transcripts, where a lost one is harmless)"""
         try:
-            message = json.dumps(data)
+            # Numbered so receivers can spot messages lost on the lossy channel
+            self._sent_seq += 1
             await self.room.local_participant.publish_data(
-                message.encode('utf-8'),
-                reliable=True
+                orjson.dumps(dict(data, seq=self._sent_seq)),
+                reliable=reliable
             )
             print(f"📨 Data message sent: {data['type']}")
         except Exception as e:
@@ -355,15 +568,25 @@ class GoogleAIVoiceAgent:
     async def on_data_received(self, data, participant):
         """Handle incoming data messages"""
         try:
-            message = json.loads(data.decode('utf-8'))
+            message = orjson.loads(data)
             print(f"📨 Received data message: {message}")
             
+            # Control messages may carry a seq number; a jump means some were lost
+            seq = message.get('seq')
+            if isinstance(seq, int):
+                if self._received_seq is not None and seq > self._received_seq + 1:
+                    print(f"⚠️ Missed {seq - self._received_seq - 1} data message(s) before seq {seq}")
+                self._received_seq = seq
+            
             # Handle different message types
             if message.get('type') == 'start_listening':
                 self.is_listening = True
+                if not self.is_speaking:
+                    self._start_listening()
                 print("👂 Started listening for user speech")
             elif message.get('type') == 'stop_listening':
                 self.is_listening = False
+                self._stop_listening()
                 print("🔇 Stopped listening for user speech")
                 
         except Exception as e:
@@ -383,21 +606,24 @@ async def main():
     # Create and run agent
     agent = GoogleAIVoiceAgent()
     
+    # Shut down on SIGTERM/SIGINT instead of polling
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, agent._shutdown.set)
+        except NotImplementedError:
+            pass  # Windows: Ctrl+C still raises KeyboardInterrupt
+    
     try:
-        await agent.connect_to_room(room_name, agent_token)
-        
-        # Keep the agent running
-        print("✅ Google AI Voice Agent is running...")
-        while True:
-            await asyncio.sleep(1)
+        # Returns once shutdown is requested; run() disconnects from the room
+        await agent.run(room_name, agent_token)
+        print("🛑 Agent stopped")
             
     except KeyboardInterrupt:
         print("🛑 Agent stopped by user")
     except Exception as e:
         print(f"❌ Agent error: {e}")
     finally:
-        if agent.room:
-            await agent.room.disconnect()
         print("👋 Google AI Voice Agent disconnected")
 
 if __name__ == "__main__":
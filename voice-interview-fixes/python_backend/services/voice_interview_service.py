@@ -1,22 +1,30 @@
 """
 Enhanced Voice Interview Service with proper Google AI agent integration
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
 from loguru import logger
-import subprocess
-import sys
-import os
+import asyncio
+import time
 
 from .livekit_service import LiveKitService
 from models.interview_models import InterviewConfig
+from livekit_voice_agent import GoogleAIVoiceAgent, get_google_clients
+
+# Sessions that are never ended (dropped connections, crashed clients) are forgotten after this long
+SESSION_TTL_SECONDS = 2 * 60 * 60
+MAX_ACTIVE_SESSIONS = 1000
 
 class VoiceInterviewService:
     """Enhanced voice interview service with Google AI agent support"""
     
     def __init__(self, livekit_service: LiveKitService):
         self.livekit = livekit_service
-        self.active_interviews: Dict[str, Dict[str, Any]] = {}
-        self.active_agents: Dict[str, subprocess.Popen] = {}
+        # Oldest first; every session lives SESSION_TTL_SECONDS, so expired ones are always at the front
+        self.active_interviews: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._session_expiry: Dict[str, float] = {}
+        # Agents run in this process, one task per session
+        self.active_agents: Dict[str, Tuple[GoogleAIVoiceAgent, asyncio.Task]] = {}
         
         logger.info("[VoiceInterviewService] Enhanced voice interview service initialized")
     
@@ -63,8 +71,10 @@ class VoiceInterviewService:
                 }
             }
             
-            # Store session
+            # Store session, making room for it first
+            self._evict_stale_sessions(max_sessions=MAX_ACTIVE_SESSIONS - 1)
             self.active_interviews[session_id] = interview_session
+            self._session_expiry[session_id] = time.monotonic() + SESSION_TTL_SECONDS
             
             # Start AI agent if enabled
             if enable_ai_agent:
@@ -91,80 +101,51 @@ class VoiceInterviewService:
             raise Exception(f"Failed to start voice interview: {error}")
     
     async def start_ai_agent(self, session_id: str, room_data: Dict[str, Any], provider: str):
-        """Start the AI agent process for the interview"""
+        """Start the AI agent for the interview as a task in this process"""
         try:
             logger.info(f"[VoiceInterviewService] Starting {provider.upper()} AI agent for session: {session_id}")
             
-            # Path to the enhanced voice agent script
-            agent_script = os.path.join(os.path.dirname(__file__), "..", "livekit_voice_agent.py")
-            
-            # Prepare environment variables
-            env = os.environ.copy()
-            env.update({
-                "LIVEKIT_WS_URL": room_data["ws_url"],
-                "LIVEKIT_API_KEY": os.getenv("LIVEKIT_API_KEY"),
-                "LIVEKIT_API_SECRET": os.getenv("LIVEKIT_API_SECRET"),
-                "VOICE_AGENT_PROVIDER": provider,
-                "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY"),
-                "GOOGLE_APPLICATION_CREDENTIALS": os.getenv("GOOGLE_APPLICATION_CREDENTIALS"),
-                "GOOGLE_CLOUD_PROJECT_ID": os.getenv("GOOGLE_CLOUD_PROJECT_ID"),
-            })
-            
-            # Start the agent process
-            process = subprocess.Popen(
-                [sys.executable, agent_script, room_data["room_name"], room_data["interviewer_token"]],
-                env=env,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+            # Sessions share one set of Gemini/TTS/STT clients
+            agent = GoogleAIVoiceAgent(get_google_clients())
+            task = asyncio.create_task(
+                agent.run(room_data["room_name"], room_data["interviewer_token"], room_data["ws_url"])
             )
             
-            # Store the process
-            self.active_agents[session_id] = process
+            # Store the agent and its task
+            self.active_agents[session_id] = (agent, task)
+            task.add_done_callback(lambda done: self._on_agent_done(session_id, provider, done))
             
-            logger.info(f"[VoiceInterviewService] {provider.upper()} AI agent started with PID: {process.pid}")
-            
-            # Monitor the process in background
-            self._monitor_agent_process(session_id, process, provider)
+            logger.info(f"[VoiceInterviewService] {provider.upper()} AI agent started for session: {session_id}")
             
         except Exception as error:
             logger.error(f"[VoiceInterviewService] Error starting AI agent: {error}")
             raise
     
-    def _monitor_agent_process(self, session_id: str, process: subprocess.Popen, provider: str):
-        """Monitor AI agent process in background"""
-        import threading
-        
-        def monitor():
-            try:
-                stdout, stderr = process.communicate()
-                if process.returncode != 0:
-                    logger.error(f"[VoiceInterviewService] {provider.upper()} AI agent exited with code {process.returncode}")
-                    logger.error(f"[VoiceInterviewService] STDERR: {stderr}")
-                else:
-                    logger.info(f"[VoiceInterviewService] {provider.upper()} AI agent completed successfully")
-                    
-                # Clean up
-                if session_id in self.active_agents:
-                    del self.active_agents[session_id]
-                    
-            except Exception as e:
-                logger.error(f"[VoiceInterviewService] Error monitoring agent process: {e}")
+    def _on_agent_done(self, session_id: str, provider: str, task: asyncio.Task):
+        """Log how the agent task finished and forget it"""
+        if task.cancelled():
+            logger.info(f"[VoiceInterviewService] {provider.upper()} AI agent stopped")
+        elif task.exception() is not None:
+            logger.error(f"[VoiceInterviewService] {provider.upper()} AI agent failed: {task.exception()}")
+        else:
+            logger.info(f"[VoiceInterviewService] {provider.upper()} AI agent completed successfully")
         
-        thread = threading.Thread(target=monitor, daemon=True)
-        thread.start()
+        # Clean up
+        entry = self.active_agents.get(session_id)
+        if entry is not None and entry[1] is task:
+            del self.active_agents[session_id]
     
     def get_session_status(self, session_id: str) -> Dict[str, Any]:
         """Get interview session status"""
-        session = self.active_interviews.get(session_id)
+        session = self._get_live_session(session_id)
         if not session:
             return {"found": False}
         
         # Check if AI agent is still running
         agent_status = "unknown"
         if session_id in self.active_agents:
-            process = self.active_agents[session_id]
-            if process.poll() is None:
+            _, task = self.active_agents[session_id]
+            if not task.done():
                 agent_status = "running"
             else:
                 agent_status = "stopped"
@@ -191,28 +172,26 @@ class VoiceInterviewService:
     async def end_interview(self, session_id: str) -> Dict[str, Any]:
         """End interview and clean up AI agent"""
         try:
-            session = self.active_interviews.get(session_id)
+            session = self._get_live_session(session_id)
             if not session:
                 return {"error": "Session not found"}
             
             # Stop AI agent if running
             if session_id in self.active_agents:
-                process = self.active_agents[session_id]
+                _, task = self.active_agents.pop(session_id)
+                # Cancelling the task disconnects the agent from the room
+                task.cancel()
                 try:
-                    process.terminate()
-                    process.wait(timeout=5)
-                    logger.info(f"[VoiceInterviewService] AI agent terminated for session: {session_id}")
-                except subprocess.TimeoutExpired:
-                    process.kill()
-                    logger.warning(f"[VoiceInterviewService] AI agent killed for session: {session_id}")
+                    await task
+                except asyncio.CancelledError:
+                    pass
                 except Exception as e:
                     logger.error(f"[VoiceInterviewService] Error stopping AI agent: {e}")
-                finally:
-                    del self.active_agents[session_id]
+                logger.info(f"[VoiceInterviewService] AI agent stopped for session: {session_id}")
             
-            # Update session status
-            session["status"] = "completed"
-            session["end_time"] = "2024-01-01T00:00:00Z"
+            # Ended sessions are no longer tracked
+            self.active_interviews.pop(session_id, None)
+            self._session_expiry.pop(session_id, None)
             
             return {
                 "completed": True,
@@ -225,14 +204,47 @@ class VoiceInterviewService:
             logger.error(f"[VoiceInterviewService] Error ending interview: {error}")
             return {"error": str(error)}
     
+    def _get_live_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a session, dropping it if it has expired"""
+        session = self.active_interviews.get(session_id)
+        if session is None:
+            return None
+        if self._session_expiry[session_id] <= time.monotonic():
+            self._drop_session(session_id)
+            logger.info(f"[VoiceInterviewService] Evicted stale session: {session_id}")
+            return None
+        return session
+    
+    def _drop_session(self, session_id: str):
+        """Forget a session and cancel its agent, if any"""
+        del self.active_interviews[session_id]
+        del self._session_expiry[session_id]
+        
+        entry = self.active_agents.pop(session_id, None)
+        if entry is not None:
+            entry[1].cancel()
+    
+    def _evict_stale_sessions(self, max_sessions: Optional[int] = None):
+        """Drop expired sessions, and the oldest ones beyond max_sessions if given, stopping their agents"""
+        now = time.monotonic()
+        while self.active_interviews:
+            session_id = next(iter(self.active_interviews))
+            if self._session_expiry[session_id] > now and (
+                max_sessions is None or len(self.active_interviews) <= max_sessions
+            ):
+                break
+            self._drop_session(session_id)
+            logger.info(f"[VoiceInterviewService] Evicted stale session: {session_id}")
+    
     def get_active_sessions(self) -> list:
         """Get all active sessions with AI agent status"""
+        self._evict_stale_sessions()
         sessions = []
         for session_id, session in self.active_interviews.items():
             agent_status = "unknown"
             if session_id in self.active_agents:
-                process = self.active_agents[session_id]
-                agent_status = "running" if process.poll() is None else "stopped"
+                _, task = self.active_agents[session_id]
+                agent_status = "running" if not task.done() else "stopped"
             
             sessions.append({
                 "session_id": session_id,